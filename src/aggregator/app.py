@@ -1,9 +1,32 @@
 import argparse
+import hmac
 import os
+import time
 from math import ceil
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify
 
-from aggregator.store import search_iocs, get_filter_values, count_iocs, get_stats
+from aggregator.metrics import HTTP_REQUEST_SECONDS, INGEST_METRICS_FILE, REGISTRY
+from aggregator.profiling import DEFAULT_PROFILE_DIR, Profiler
+from aggregator.responses import SHAPES, json_response, shape_rows
+
+from aggregator.scheduler import SCHEDULE_STATUS_FILE, load_status
+from aggregator.snapshot import SNAPSHOT_FILE, SnapshotReader
+from aggregator.store import (
+    SEARCH_COLUMNS,
+    SORT_ORDERS,
+    count_iocs,
+    get_filter_values,
+    get_stats,
+    last_modified,
+    search_iocs,
+    search_rows,
+    suggest_iocs,
+)
+from aggregator.utils import state_path
+
+SUGGEST_CACHE_SECONDS = 30
+SUGGEST_CACHE_SIZE = 4096
+SUGGEST_MAX_LIMIT = 50
 
 
 def _get_int(value: str, default: int, minimum: int = 1, maximum: int | None = None) -> int:
@@ -18,11 +41,68 @@ def _get_int(value: str, default: int, minimum: int = 1, maximum: int | None = N
     return parsed
 
 
+def _is_admin(admin_token: str) -> bool:
+    supplied = request.headers.get("X-Admin-Token", "")
+    return bool(admin_token) and hmac.compare_digest(supplied, admin_token)
+
+
+class TTLCache:
+    """Small time-bounded response cache; cleared wholesale when full."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: dict = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def put(self, key, value) -> None:
+        if len(self._entries) >= self.max_entries:
+            self._entries.clear()
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+
+
 def create_app(db_path: str) -> Flask:
     base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
     templates_dir = os.path.join(base_dir, "templates")
     static_dir = os.path.join(base_dir, "static")
     app = Flask(__name__, template_folder=templates_dir, static_folder=static_dir)
+    admin_token = os.environ.get("AGGREGATOR_ADMIN_TOKEN", "")
+    profile_dir = os.environ.get("AGGREGATOR_PROFILE_DIR", DEFAULT_PROFILE_DIR)
+    snapshots = SnapshotReader(os.environ.get("AGGREGATOR_SNAPSHOT") or state_path(db_path, SNAPSHOT_FILE))
+    schedule_status_path = os.environ.get("AGGREGATOR_SCHEDULE_STATUS") or state_path(db_path, SCHEDULE_STATUS_FILE)
+    suggestions = TTLCache(SUGGEST_CACHE_SECONDS, SUGGEST_CACHE_SIZE)
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+        if request.args.get("profile") == "1":
+            if not _is_admin(admin_token):
+                return jsonify({"status": "error", "message": "profiling requires a valid X-Admin-Token"}), 403
+            g.profiler = Profiler(profile_dir, f"api-{request.endpoint or 'unmatched'}").start()
+
+    @app.teardown_request
+    def stop_profiler(exc):
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.stop()
+
+    @app.after_request
+    def record_latency(response):
+        started = g.pop("request_started", None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - started,
+                endpoint=endpoint,
+                method=request.method,
+                status=str(response.status_code),
+            )
+        return response
 
     @app.route("/")
     def index():
@@ -33,6 +113,10 @@ def create_app(db_path: str) -> Flask:
         search_mode = request.args.get("search_mode", "simple")  # simple, regex, cidr
         date_from = request.args.get("date_from", "")
         date_to = request.args.get("date_to", "")
+        sort = request.args.get("sort", "date")
+        if sort not in SORT_ORDERS:
+            sort = "date"
+        min_sources = _get_int(request.args.get("min_sources", "0"), default=0, minimum=0)
         page = _get_int(request.args.get("page", "1"), default=1, minimum=1)
         page_size = _get_int(request.args.get("page_size", "200"), default=200, minimum=1, maximum=1000)
 
@@ -45,6 +129,7 @@ def create_app(db_path: str) -> Flask:
             search_mode=search_mode,
             date_from=date_from,
             date_to=date_to,
+            min_sources=min_sources,
         )
         page_count = max(ceil(total_results / page_size), 1) if total_results else 1
         page = min(page, page_count)
@@ -61,6 +146,8 @@ def create_app(db_path: str) -> Flask:
             date_to=date_to,
             limit=page_size,
             offset=offset,
+            sort=sort,
+            min_sources=min_sources,
         )
         filters = get_filter_values(db_path)
         stats = get_stats(db_path)
@@ -78,6 +165,8 @@ def create_app(db_path: str) -> Flask:
             search_mode=search_mode,
             date_from=date_from,
             date_to=date_to,
+            sort=sort,
+            min_sources=min_sources,
             sources=sources,
             types=types,
             severities=severities,
@@ -100,8 +189,13 @@ def create_app(db_path: str) -> Flask:
         - search_mode: simple|regex|cidr (default: simple)
         - date_from: Start date (YYYY-MM-DD)
         - date_to: End date (YYYY-MM-DD)
+        - sort: date|score (default: date)
+        - min_sources: Only IOCs reported by at least N sources
         - page: Page number (default: 1)
         - page_size: Results per page (default: 200, max: 1000)
+        - shape: rows|columnar (default: rows)
+
+        The body is gzip/br/zstd compressed when the client's Accept-Encoding allows it.
         """
         try:
             query = request.args.get("query", "")
@@ -111,8 +205,13 @@ def create_app(db_path: str) -> Flask:
             search_mode = request.args.get("search_mode", "simple")
             date_from = request.args.get("date_from", "")
             date_to = request.args.get("date_to", "")
+            sort = request.args.get("sort", "date")
+            min_sources = _get_int(request.args.get("min_sources", "0"), default=0, minimum=0)
             page = _get_int(request.args.get("page", "1"), default=1, minimum=1)
             page_size = _get_int(request.args.get("page_size", "200"), default=200, minimum=1, maximum=1000)
+            shape = request.args.get("shape", "rows")
+            if shape not in SHAPES:
+                raise ValueError(f"Unsupported shape: {shape}")
 
             total_results = count_iocs(
                 db_path,
@@ -123,12 +222,13 @@ def create_app(db_path: str) -> Flask:
                 search_mode=search_mode,
                 date_from=date_from,
                 date_to=date_to,
+                min_sources=min_sources,
             )
             page_count = max(ceil(total_results / page_size), 1) if total_results else 1
             page = min(page, page_count)
             offset = (page - 1) * page_size
 
-            results = search_iocs(
+            rows = search_rows(
                 db_path,
                 query=query,
                 ioc_type=ioc_type,
@@ -139,11 +239,13 @@ def create_app(db_path: str) -> Flask:
                 date_to=date_to,
                 limit=page_size,
                 offset=offset,
+                sort=sort,
+                min_sources=min_sources,
             )
 
-            return jsonify({
+            return json_response({
                 "status": "success",
-                "data": results,
+                "data": shape_rows(SEARCH_COLUMNS, rows, shape),
                 "pagination": {
                     "page": page,
                     "page_size": page_size,
@@ -178,6 +280,82 @@ def create_app(db_path: str) -> Flask:
         except Exception as e:
             return jsonify({"status": "error", "message": str(e)}), 400
 
+    @app.route("/api/schedule", methods=["GET"])
+    def api_schedule():
+        """Get per-feed scheduler status (last run, duration, next run)."""
+        try:
+            status = load_status(schedule_status_path)
+            return jsonify({
+                "status": "success",
+                "data": status
+            })
+        except Exception as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+    @app.route("/api/lookup", methods=["GET"])
+    def api_lookup():
+        """Exact and CIDR lookup of one value against the memory-mapped snapshot."""
+        value = request.args.get("value", "").strip()
+        if not value:
+            return jsonify({"status": "error", "message": "value is required"}), 400
+        try:
+            snapshot = snapshots.get()
+            if snapshot is None:
+                return jsonify({"status": "error", "message": "lookup snapshot not available"}), 503
+            return jsonify({
+                "status": "success",
+                "data": {
+                    "value": value,
+                    "matches": snapshot.lookup(value),
+                    "snapshot_built_at": snapshot.built_at,
+                }
+            })
+        except Exception as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+    @app.route("/api/suggest", methods=["GET"])
+    def api_suggest():
+        """Autocomplete IOC values from the prefix index, highest score first.
+
+        Query Parameters:
+        - prefix: Leading characters of a value, host or registered domain
+        - type: IOC type filter
+        - limit: Number of completions (default: 10, max: 50)
+        """
+        prefix = request.args.get("prefix", "").strip().lower()
+        if not prefix:
+            return jsonify({"status": "error", "message": "prefix is required"}), 400
+        ioc_type = request.args.get("type", "")
+        limit = _get_int(request.args.get("limit", "10"), default=10, minimum=1, maximum=SUGGEST_MAX_LIMIT)
+        try:
+            # The DB modification time is part of the key, so an ingest run
+            # invalidates cached completions without waiting for the TTL.
+            key = (prefix, ioc_type.lower(), limit, last_modified(db_path))
+        except FileNotFoundError:
+            key = None
+        try:
+            data = suggestions.get(key) if key else None
+            if data is None:
+                data = suggest_iocs(db_path, prefix, ioc_type=ioc_type, limit=limit)
+                if key:
+                    suggestions.put(key, data)
+            response = jsonify({"status": "success", "data": data})
+            response.cache_control.max_age = SUGGEST_CACHE_SECONDS
+            return response
+        except Exception as e:
+            return jsonify({"status": "error", "message": str(e)}), 400
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Prometheus metrics: request/query metrics plus the last ingest run's metrics."""
+        body = REGISTRY.render()
+        try:
+            with open(state_path(db_path, INGEST_METRICS_FILE), "r", encoding="utf-8") as handle:
+                body += handle.read()
+        except FileNotFoundError:
+            pass
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
     @app.route("/api/health", methods=["GET"])
     def api_health():
         """Health check endpoint."""
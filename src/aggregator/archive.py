@@ -0,0 +1,160 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from typing import Iterable, Iterator
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+from aggregator.defaults import ARCHIVE_CODECS as CODECS, ARCHIVE_MAX_BYTES as DEFAULT_MAX_BYTES
+
+ARCHIVE_INDEX = "index.jsonl"
+CODEC_EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+READ_SIZE = 64 * 1024
+
+
+class FeedArchive:
+    """Content-addressed store of raw feed bodies for offline replay.
+
+    Each body is compressed into ``objects/<sha[:2]>/<sha256>.<ext>`` (hash of
+    the uncompressed bytes, so identical downloads share one blob), and every
+    download appends a metadata line to ``index.jsonl``. When blobs exceed
+    ``max_bytes``, the least recently referenced ones are removed along with
+    their index entries.
+    """
+
+    def __init__(self, root: str, codec: str = "gzip", max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        if codec not in CODECS:
+            raise ValueError(f"Unsupported archive codec: {codec}")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("zstd archive codec requires the 'zstandard' package")
+        self.root = root
+        self.codec = codec
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(root, ARCHIVE_INDEX)
+        self._lock = threading.Lock()
+
+    def _open_writer(self, handle):
+        if self.codec == "zstd":
+            return zstandard.ZstdCompressor(level=3).stream_writer(handle, closefd=False)
+        return gzip.GzipFile(fileobj=handle, mode="wb", compresslevel=6)
+
+    def tee(self, chunks: Iterable[bytes], metadata: dict) -> Iterator[bytes]:
+        """Yield ``chunks`` unchanged while archiving them.
+
+        The blob and its index entry are only committed once the body has been
+        read to the end; a failed or abandoned download leaves nothing behind.
+        """
+        tmp_dir = os.path.join(self.root, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=tmp_dir)
+        hasher = hashlib.sha256()
+        size = 0
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                writer = self._open_writer(handle)
+                for chunk in chunks:
+                    hasher.update(chunk)
+                    writer.write(chunk)
+                    size += len(chunk)
+                    yield chunk
+                writer.close()
+            self._commit(temp_path, hasher.hexdigest(), size, metadata)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _commit(self, temp_path: str, digest: str, size: int, metadata: dict) -> None:
+        relative = os.path.join("objects", digest[:2], f"{digest}.{CODEC_EXTENSIONS[self.codec]}")
+        blob_path = os.path.join(self.root, relative)
+        with self._lock:
+            if os.path.exists(blob_path):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(temp_path, blob_path)
+            entry = {
+                **metadata,
+                "sha256": digest,
+                "codec": self.codec,
+                "path": relative.replace(os.sep, "/"),
+                "size": size,
+                "stored_size": os.path.getsize(blob_path),
+            }
+            with open(self.index_path, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(entry, sort_keys=True) + "\n")
+            self._prune()
+
+    def entries(self, since: str = "", until: str = "", feeds: Iterable[str] = ()) -> list[dict]:
+        """Index entries in fetch order, filtered by date (YYYY-MM-DD, inclusive) and feed name."""
+        wanted = set(feeds)
+        results = []
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as handle:
+                for line in handle:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    day = entry.get("fetched_at", "")[:10]
+                    if since and day < since:
+                        continue
+                    if until and day > until:
+                        continue
+                    if wanted and entry.get("feed") not in wanted:
+                        continue
+                    results.append(entry)
+        except FileNotFoundError:
+            pass
+        return results
+
+    def _prune(self) -> None:
+        entries = self.entries()
+        last_use: dict[str, int] = {}
+        stored: dict[str, int] = {}
+        for position, entry in enumerate(entries):
+            last_use[entry["path"]] = position
+            stored[entry["path"]] = entry["stored_size"]
+        total = sum(stored.values())
+        if total <= self.max_bytes:
+            return
+
+        removed = set()
+        for path in sorted(last_use, key=last_use.get):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.root, path))
+            except FileNotFoundError:
+                pass
+            total -= stored[path]
+            removed.add(path)
+
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            for entry in entries:
+                if entry["path"] not in removed:
+                    handle.write(json.dumps(entry, sort_keys=True) + "\n")
+        os.replace(temp_path, self.index_path)
+
+
+def iter_blob(root: str, entry: dict, read_size: int = READ_SIZE) -> Iterator[bytes]:
+    """Yield the decompressed body of an archived download in chunks."""
+    path = os.path.join(root, entry["path"])
+    with open(path, "rb") as raw:
+        if entry.get("codec") == "zstd":
+            if zstandard is None:
+                raise ValueError("reading zstd archives requires the 'zstandard' package")
+            reader = zstandard.ZstdDecompressor().stream_reader(raw)
+        else:
+            reader = gzip.GzipFile(fileobj=raw, mode="rb")
+        with reader:
+            while True:
+                chunk = reader.read(read_size)
+                if not chunk:
+                    break
+                yield chunk
@@ -0,0 +1,414 @@
+import csv
+import datetime as dt
+import functools
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import string
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable
+
+from aggregator.fetcher import CHUNK_SIZE, fetch_feed_stream
+from aggregator.metrics import timed_iter
+from aggregator.normalizer import dedupe_iocs, normalize_items
+from aggregator.parsers import parse_feed, parse_feed_stream
+from aggregator.snapshot import SNAPSHOT_FILE, Snapshot, write_snapshot
+from aggregator.store import (
+    SEARCH_COLUMNS,
+    create_sharded_store,
+    export_iocs,
+    iter_ioc_values,
+    search_iocs,
+    search_rows,
+    suggest_iocs,
+    upsert_iocs,
+)
+from aggregator.utils import state_path
+
+REPORT_VERSION = 1
+TLDS = ("com", "net", "org", "info", "ru", "cn", "io", "xyz", "top", "biz")
+URL_PATHS = ("login", "wp-admin", "update", "invoice", "bin", "payload", "secure", "verify", "files", "download")
+
+# Synthetic feeds, modelled on the shapes of the configured public feeds.
+# share: fraction of the corpus; overlap: fraction of values drawn from a shared pool.
+CORPUS_FEEDS = (
+    {"name": "bench-ips", "file": "ips.txt", "format": "txt", "kind": "ip", "share": 0.35, "overlap": 0.2},
+    {"name": "bench-netset", "file": "netset.txt", "format": "txt", "kind": "cidr", "share": 0.05, "overlap": 0.0},
+    {"name": "bench-urls", "file": "urls.txt", "format": "txt", "kind": "url", "share": 0.3, "overlap": 0.1},
+    {"name": "bench-domains", "file": "domains.csv", "format": "csv", "kind": "domain", "share": 0.15, "overlap": 0.2},
+    {"name": "bench-mixed", "file": "mixed.json", "format": "json", "kind": "mixed", "share": 0.15, "overlap": 0.3},
+)
+
+SEARCH_CASES = (
+    {"name": "search_simple", "search_mode": "simple", "query": "10."},
+    {"name": "search_regex", "search_mode": "regex", "query": r"^45\.[0-9]+\.", "ioc_type": "ip"},
+    {"name": "search_cidr", "search_mode": "cidr", "query": "45.0.0.0/8", "ioc_type": "ip"},
+    {"name": "search_filtered", "search_mode": "simple", "query": "", "source": "bench-urls"},
+    {"name": "search_top_score", "search_mode": "simple", "query": "", "ioc_type": "ip", "sort": "score"},
+)
+
+SUGGEST_CASES = (
+    ("suggest_short", "a"),
+    ("suggest_ip_octets", "45.1"),
+    ("suggest_url", "https://a"),
+)
+
+API_CASES = (
+    ("api_iocs", "/api/iocs?page_size=200"),
+    ("api_iocs_search", "/api/iocs?query=login&type=url&page_size=200"),
+    ("api_iocs_top_score", "/api/iocs?type=ip&sort=score&min_sources=2&page_size=1000"),
+    ("api_iocs_cidr", "/api/iocs?query=45.0.0.0/8&search_mode=cidr&type=ip&page_size=200"),
+    ("api_stats", "/api/stats"),
+    ("api_filters", "/api/filters"),
+    ("api_lookup", "/api/lookup?value=10.1.2.3"),
+    ("api_suggest", "/api/suggest?prefix=45.1&limit=10"),
+)
+
+
+class _IocFactory:
+    def __init__(self, rng: random.Random) -> None:
+        self.rng = rng
+
+    def ip(self) -> str:
+        rng = self.rng
+        if rng.random() < 0.03:
+            return "2001:db8:%x:%x::%x" % (rng.getrandbits(16), rng.getrandbits(16), rng.getrandbits(16))
+        return "%d.%d.%d.%d" % (rng.randint(1, 223), rng.randint(0, 255), rng.randint(0, 255), rng.randint(1, 254))
+
+    def cidr(self) -> str:
+        rng = self.rng
+        prefix = rng.choice((16, 20, 22, 24, 24, 24))
+        address = rng.getrandbits(prefix) << (32 - prefix)
+        octets = [(address >> shift) & 0xFF for shift in (24, 16, 8, 0)]
+        octets[0] = max(octets[0] % 224, 1)
+        return "%d.%d.%d.%d/%d" % (*octets, prefix)
+
+    def domain(self) -> str:
+        rng = self.rng
+        labels = [
+            "".join(rng.choices(string.ascii_lowercase + string.digits, k=rng.randint(4, 12)))
+            for _ in range(rng.randint(1, 3))
+        ]
+        return ".".join(labels) + "." + rng.choice(TLDS)
+
+    def url(self) -> str:
+        rng = self.rng
+        host = self.domain() if rng.random() < 0.8 else self.ip()
+        if ":" in host:
+            host = f"[{host}]"
+        path = "/".join(rng.choices(URL_PATHS, k=rng.randint(1, 3)))
+        query = f"?id={rng.getrandbits(32):x}" if rng.random() < 0.3 else ""
+        return f"{rng.choice(('http', 'https'))}://{host}/{path}{query}"
+
+    def mixed(self) -> str:
+        return getattr(self, self.rng.choice(("ip", "domain", "url")))()
+
+
+def generate_corpus(directory: str, size: int, seed: int = 1) -> list[dict]:
+    """Write synthetic txt/csv/json feeds totalling ``size`` IOCs into ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    factory = _IocFactory(rng)
+    shared = {kind: [getattr(factory, kind)() for _ in range(1000)] for kind in ("ip", "domain", "url", "mixed")}
+
+    feeds = []
+    for spec in CORPUS_FEEDS:
+        count = max(int(size * spec["share"]), 1)
+        make = getattr(factory, spec["kind"])
+        pool = shared.get(spec["kind"])
+
+        def values(count=count, make=make, pool=pool, overlap=spec["overlap"]):
+            for _ in range(count):
+                yield rng.choice(pool) if pool and rng.random() < overlap else make()
+
+        path = os.path.join(directory, spec["file"])
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            if spec["format"] == "txt":
+                handle.write(f"# {spec['name']} synthetic feed\n")
+                for value in values():
+                    handle.write(value + "\n")
+            elif spec["format"] == "csv":
+                writer = csv.writer(handle)
+                writer.writerow(["value", "first_seen", "reporter"])
+                for value in values():
+                    writer.writerow([value, "2026-01-01 00:00:00", "bench"])
+            else:
+                handle.write('{"query_status": "ok", "data": [')
+                for index, value in enumerate(values()):
+                    record = {"ioc": value, "threat_type": "botnet_cc", "severity": rng.choice(("high", "medium"))}
+                    handle.write(("," if index else "") + json.dumps(record))
+                handle.write("]}")
+        feeds.append({**spec, "path": path, "count": count, "bytes": os.path.getsize(path)})
+    return feeds
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format: str, *args: object) -> None:
+        pass
+
+
+def serve_directory(directory: str) -> tuple[ThreadingHTTPServer, str]:
+    """Serve ``directory`` over HTTP on a free localhost port as a stand-in for upstream feeds."""
+    handler = functools.partial(_QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def _timed(func: Callable[[], object]) -> tuple[float, object]:
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, result
+
+
+def _summary(seconds: float, count: int | None = None, **extra: object) -> dict:
+    result = {"seconds": round(seconds, 6)}
+    if count is not None:
+        result["count"] = count
+        result["per_second"] = round(count / seconds, 1) if seconds > 0 else None
+    result.update(extra)
+    return result
+
+
+def _repeat(func: Callable[[], object], repeat: int) -> tuple[dict, object]:
+    samples = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        seconds, result = _timed(func)
+        samples.append(seconds)
+    samples.sort()
+    p95 = samples[min(int(len(samples) * 0.95), len(samples) - 1)]
+    stats = {
+        "runs": len(samples),
+        "min": round(samples[0], 6),
+        "median": round(statistics.median(samples), 6),
+        "p95": round(p95, 6),
+    }
+    return stats, result
+
+
+def _write_sized_feed(path: str, feed_format: str, target_bytes: int, factory: _IocFactory) -> int:
+    with open(path, "w", encoding="utf-8", newline="") as handle:
+        if feed_format == "csv":
+            writer = csv.writer(handle)
+            writer.writerow(["value", "first_seen", "reporter"])
+            while handle.tell() < target_bytes:
+                writer.writerow([factory.mixed(), "2026-01-01 00:00:00", "bench"])
+        else:
+            handle.write('{"query_status": "ok", "data": [')
+            first = True
+            while handle.tell() < target_bytes:
+                record = {"ioc": factory.mixed(), "threat_type": "botnet_cc", "severity": "high"}
+                handle.write(("" if first else ",") + json.dumps(record))
+                first = False
+            handle.write("]}")
+    return os.path.getsize(path)
+
+
+def _peak_memory(func: Callable[[], int]) -> tuple[int, float, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        records = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return records, time.perf_counter() - started, peak
+
+
+def benchmark_parse_memory(directory: str, megabytes: int, seed: int = 1) -> dict:
+    """Compare peak traced memory of buffered vs streaming JSON/CSV parsing."""
+    os.makedirs(directory, exist_ok=True)
+    factory = _IocFactory(random.Random(seed))
+    results = {}
+    for feed_format in ("json", "csv"):
+        path = os.path.join(directory, f"large.{feed_format}")
+        size = _write_sized_feed(path, feed_format, megabytes * 1024 * 1024, factory)
+
+        def buffered() -> int:
+            with open(path, "r", encoding="utf-8") as handle:
+                text = handle.read()
+            return len(parse_feed(text, feed_format))
+
+        def streaming() -> int:
+            with open(path, "rb") as handle:
+                chunks = iter(lambda: handle.read(CHUNK_SIZE), b"")
+                return sum(1 for _ in parse_feed_stream(chunks, feed_format))
+
+        records, buffered_seconds, buffered_peak = _peak_memory(buffered)
+        _, streaming_seconds, streaming_peak = _peak_memory(streaming)
+        results[f"parse_memory_{feed_format}"] = {
+            "bytes": size,
+            "records": records,
+            "buffered_peak_bytes": buffered_peak,
+            "streaming_peak_bytes": streaming_peak,
+            "buffered_seconds": round(buffered_seconds, 3),
+            "streaming_seconds": round(streaming_seconds, 3),
+        }
+        os.remove(path)
+    return results
+
+
+def benchmark_snapshot(db_path: str, snapshot_path: str, seed: int = 1, sample: int = 100000) -> dict:
+    """Time snapshot build, open, and lookups of stored values and random misses."""
+    seconds, info = _timed(lambda: write_snapshot(db_path, snapshot_path))
+    results = {"snapshot_build": _summary(seconds, info["values"], bytes=info["bytes"])}
+    seconds, snapshot = _timed(lambda: Snapshot(snapshot_path))
+    results["snapshot_open"] = _summary(seconds)
+
+    rng = random.Random(seed)
+    stored = [value for _, value in itertools.islice(iter_ioc_values(db_path), sample)]
+    misses = ["%d.%d.%d.%d" % tuple(rng.randint(1, 254) for _ in range(4)) for _ in range(len(stored))]
+    for name, values in (("snapshot_match_hits", stored), ("snapshot_match_misses", misses)):
+        seconds, matched = _timed(lambda: sum(1 for value in values if snapshot.match(value)))
+        results[name] = _summary(seconds, len(values), matched=matched)
+    seconds, _ = _timed(lambda: [snapshot.lookup(value) for value in stored])
+    results["snapshot_lookup_records"] = _summary(seconds, len(stored))
+    return results
+
+
+def benchmark_responses(client, db_path: str, repeat: int, page_size: int = 1000) -> dict:
+    """Time and size one large ``/api/iocs`` page per response shape and content coding.
+
+    Bare serialization of the same rows is timed too, against the stdlib
+    ``json`` path that ``jsonify`` takes.
+    """
+    from aggregator.responses import AVAILABLE_ENCODINGS, SHAPES, dumps, shape_rows
+
+    rows = search_rows(db_path, limit=page_size)
+    stats, body = _repeat(lambda: json.dumps([dict(zip(SEARCH_COLUMNS, row)) for row in rows]).encode(), repeat)
+    results = {"serialize_page_stdlib": {**stats, "rows": len(rows), "bytes": len(body)}}
+    for shape in SHAPES:
+        stats, body = _repeat(lambda: dumps(shape_rows(SEARCH_COLUMNS, rows, shape)), repeat)
+        results[f"serialize_page_{shape}"] = {**stats, "rows": len(rows), "bytes": len(body)}
+        for encoding in ("identity",) + AVAILABLE_ENCODINGS:
+            url = f"/api/iocs?page_size={page_size}&shape={shape}"
+            stats, response = _repeat(lambda: client.get(url, headers={"Accept-Encoding": encoding}), repeat)
+            results[f"api_page_{shape}_{encoding}"] = {
+                **stats,
+                "status": response.status_code,
+                "bytes": len(response.data),
+            }
+    return results
+
+
+def run_benchmarks(
+    size: int,
+    seed: int = 1,
+    repeat: int = 5,
+    workdir: str = "",
+    parse_memory_mb: int = 0,
+    shards: int = 0,
+) -> dict:
+    """Generate a corpus, ingest it through the pipeline stages and time each one.
+
+    With ``shards`` the store is a hash-partitioned sharded store instead of a single file.
+    """
+    base_dir = workdir or tempfile.mkdtemp(prefix="aggregator-bench-")
+    corpus_dir = os.path.join(base_dir, "corpus")
+    db_path = os.path.join(base_dir, "bench-shards" if shards else "bench.db")
+    if os.path.isdir(db_path):
+        shutil.rmtree(db_path)
+    elif os.path.exists(db_path):
+        os.remove(db_path)
+    try:
+        if shards:
+            create_sharded_store(db_path, shards=shards)
+        results: dict[str, dict] = {}
+        seconds, feeds = _timed(lambda: generate_corpus(corpus_dir, size, seed))
+        results["generate"] = _summary(seconds, sum(feed["count"] for feed in feeds))
+
+        seen: set[tuple[str, str, str]] = set()
+        server, base_url = serve_directory(corpus_dir)
+        totals = {stage: 0.0 for stage in ("fetch", "parse", "normalize", "upsert")}
+        counts = {"bytes": 0, "items": 0, "iocs": 0, "inserted": 0}
+        try:
+            for feed in feeds:
+                url = f"{base_url}/{feed['file']}"
+                # Same streaming path as `fetch`: download and parse interleave, so time spent
+                # waiting on chunks is taken out of the parse total.
+                timings: dict = {}
+                chunks = timed_iter(fetch_feed_stream(url, retries=0), timings, "fetch")
+                items = list(timed_iter(parse_feed_stream(chunks, feed["format"]), timings, "parse"))
+                fetch_seconds = timings["fetch"]
+                parse_seconds = timings["parse"] - fetch_seconds
+                normalize_seconds, iocs = _timed(
+                    lambda: dedupe_iocs(normalize_items(items, source=feed["name"], default_severity="medium"), seen)
+                )
+                upsert_seconds, inserted = _timed(lambda: upsert_iocs(db_path, iocs))
+
+                results[f"feed:{feed['name']}"] = {
+                    "format": feed["format"],
+                    "bytes": feed["bytes"],
+                    "fetch": _summary(fetch_seconds, feed["bytes"], unit="bytes"),
+                    "parse": _summary(parse_seconds, len(items)),
+                    "normalize": _summary(normalize_seconds, len(items)),
+                    "upsert": _summary(upsert_seconds, len(iocs), inserted=inserted),
+                }
+                stage_seconds = (fetch_seconds, parse_seconds, normalize_seconds, upsert_seconds)
+                for stage, seconds in zip(totals, stage_seconds):
+                    totals[stage] += seconds
+                counts["bytes"] += feed["bytes"]
+                counts["items"] += len(items)
+                counts["iocs"] += len(iocs)
+                counts["inserted"] += inserted
+                del items, iocs
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        results["fetch"] = _summary(totals["fetch"], counts["bytes"], unit="bytes")
+        results["parse"] = _summary(totals["parse"], counts["items"])
+        results["normalize"] = _summary(totals["normalize"], counts["items"])
+        results["upsert"] = _summary(totals["upsert"], counts["iocs"], inserted=counts["inserted"])
+
+        for case in SEARCH_CASES:
+            params = {key: value for key, value in case.items() if key != "name"}
+            stats, rows = _repeat(lambda: search_iocs(db_path, limit=200, **params), repeat)
+            results[case["name"]] = {**stats, "rows": len(rows)}
+
+        for name, prefix in SUGGEST_CASES:
+            stats, rows = _repeat(lambda: suggest_iocs(db_path, prefix), repeat)
+            results[name] = {**stats, "rows": len(rows)}
+
+        export_path = os.path.join(base_dir, "export.json")
+        seconds, _ = _timed(lambda: export_iocs(db_path, export_path))
+        results["export"] = _summary(seconds, counts["inserted"], bytes=os.path.getsize(export_path))
+        results.update(benchmark_snapshot(db_path, state_path(db_path, SNAPSHOT_FILE), seed))
+
+        from aggregator.app import create_app
+
+        client = create_app(db_path).test_client()
+        for name, url in API_CASES:
+            stats, response = _repeat(lambda: client.get(url), repeat)
+            results[name] = {**stats, "status": response.status_code, "bytes": len(response.data)}
+        results.update(benchmark_responses(client, db_path, repeat))
+
+        if parse_memory_mb:
+            results.update(benchmark_parse_memory(os.path.join(base_dir, "large"), parse_memory_mb, seed))
+    finally:
+        if not workdir:
+            shutil.rmtree(base_dir, ignore_errors=True)
+
+    return {
+        "report_version": REPORT_VERSION,
+        "generated_at": dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z",
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "size": size,
+        "shards": shards,
+        "seed": seed,
+        "repeat": repeat,
+        "corpus": {"iocs": sum(feed["count"] for feed in feeds), **counts},
+        "results": results,
+    }
@@ -1,65 +1,301 @@
 import argparse
+import collections
+import contextlib
+import itertools
 import json
+import os
 import sys
+import threading
 import time
+from typing import TYPE_CHECKING, Iterable
 
-from aggregator.fetcher import fetch_feed
-from aggregator.parsers import parse_feed
-from aggregator.normalizer import normalize_items
-from aggregator.store import upsert_iocs, search_iocs, export_iocs
-from aggregator.utils import load_feeds_config, configure_logging
-from aggregator.app import create_app
+from aggregator.defaults import (
+    ARCHIVE_CODECS,
+    ARCHIVE_MAX_BYTES,
+    PROFILE_DIR,
+    PROFILE_KEEP,
+    PROFILE_TOP,
+    SCAN_CHUNK_BYTES,
+    SCHEDULE_MAX_BACKOFF,
+)
+from aggregator.metrics import (
+    INGEST_BYTES,
+    INGEST_DUPLICATES,
+    INGEST_FAILURES,
+    INGEST_METRICS_FILE,
+    INGEST_REGISTRY,
+    INGEST_ROWS_INSERTED,
+    INGEST_RUN_DUPLICATES,
+    INGEST_STAGE_SECONDS,
+    timed,
+    timed_iter,
+)
+from aggregator.parsers import parse_feed_stream
+from aggregator.normalizer import IOC, dedupe_iocs, normalize_items, utc_timestamp
+from aggregator.store import (
+    SHARD_PARTITIONS,
+    create_sharded_store,
+    export_iocs,
+    iter_ioc_records,
+    search_iocs,
+    upsert_iocs,
+)
+from aggregator.utils import load_feeds_config, configure_logging, state_path
+
+if TYPE_CHECKING:
+    # Only for annotations; the commands that use them import these modules lazily.
+    from concurrent.futures import Future
+
+    from aggregator.archive import FeedArchive
+
+
+INGEST_STAGES = ("fetch", "archive", "read", "parse", "normalize", "upsert")
+
+
+def _parse_and_normalize(
+    chunks: Iterable[bytes],
+    feed_format: str,
+    source: str,
+    severity: str | None,
+    timings: dict,
+    now: str,
+    encoding: str | None = None,
+) -> list[IOC]:
+    """Parse and normalize a body as it streams in.
+
+    Download, parse and normalize interleave; time spent pulling from each
+    upstream iterator is attributed to that stage, so callers subtract their
+    own upstream stage from ``timings["parse"]``.
+    """
+    items = timed_iter(parse_feed_stream(chunks, feed_format, encoding), timings, "parse", count_key="items")
+    with timed(timings, "normalize"):
+        normalized = normalize_items(items, source=source, default_severity=severity, now=now)
+    timings["normalize"] -= timings["parse"]
+    return normalized
+
+
+def _dedupe(normalized: list[IOC], seen: set, timings: dict) -> list[IOC]:
+    with timed(timings, "normalize"):
+        iocs = dedupe_iocs(normalized, seen)
+    timings["run_duplicates"] = len(normalized) - len(iocs)
+    timings["dedupe_ratio"] = timings["run_duplicates"] / len(normalized) if normalized else 0.0
+    return iocs
+
+
+def _ingest_feed(
+    feed: dict,
+    args: argparse.Namespace,
+    timings: dict,
+    seen: set,
+    archive: "FeedArchive | None" = None,
+) -> list[IOC]:
+    """Fetch, parse, normalize and dedupe a single feed, applying the per-feed cap.
+
+    ``seen`` holds the (type, value, source) keys already ingested in this run.
+    When ``archive`` is set the raw body is also stored for ``replay``.
+    """
+    from aggregator.fetcher import fetch_feed_stream
+
+    name = feed["name"]
+    fetched_at = utc_timestamp()
+    chunks = fetch_feed_stream(
+        feed["url"],
+        headers=feed.get("headers"),
+        timeout=feed.get("timeout") or args.timeout,
+        retries=args.retries,
+        backoff=args.backoff,
+        stats=timings,
+    )
+    chunks = timed_iter(chunks, timings, "fetch")
+    # The response charset is only known once the request is answered, so pull the
+    # first chunk before the decoder is chosen.
+    first = next(chunks, None)
+    primed = timings["fetch"]
+    encoding = timings.get("encoding")
+    if first is not None:
+        chunks = itertools.chain((first,), chunks)
+    upstream = "fetch"
+    if archive is not None:
+        metadata = {
+            "feed": name,
+            "url": feed["url"],
+            "format": feed["format"],
+            "severity": feed.get("severity"),
+            "fetched_at": fetched_at,
+            "encoding": encoding,
+        }
+        chunks = timed_iter(archive.tee(chunks, metadata), timings, "archive")
+        upstream = "archive"
+
+    normalized = _parse_and_normalize(
+        chunks, feed["format"], name, feed.get("severity"), timings, fetched_at, encoding
+    )
+    timings["parse"] -= timings[upstream] - (primed if upstream == "fetch" else 0.0)
+    if archive is not None:
+        # JSON parsing stops at the end of the record array; read the rest of the body
+        # so the tee sees it end and commits the complete blob.
+        for _ in chunks:
+            pass
+        timings["archive"] -= timings["fetch"] - primed
+    iocs = _dedupe(normalized, seen, timings)
+
+    if args.max_per_feed and len(iocs) > args.max_per_feed:
+        iocs = iocs[: args.max_per_feed]
+    return iocs
+
+
+def _replay_entry(archive_root: str, entry: dict) -> tuple[list[IOC], dict]:
+    """Parse and normalize one archived body (runs in a replay worker process)."""
+    from aggregator.archive import iter_blob
+
+    timings: dict = {"bytes": entry["size"]}
+    chunks = timed_iter(iter_blob(archive_root, entry), timings, "read")
+    normalized = _parse_and_normalize(
+        chunks,
+        entry["format"],
+        entry["feed"],
+        entry.get("severity"),
+        timings,
+        entry["fetched_at"],
+        entry.get("encoding"),
+    )
+    timings["parse"] -= timings["read"]
+    return normalized, timings
+
+
+def _run_now(func, *args) -> "Future":
+    """Run ``func`` inline and wrap its outcome in a completed Future."""
+    from concurrent.futures import Future
+
+    future = Future()
+    try:
+        future.set_result(func(*args))
+    except Exception as exc:
+        future.set_exception(exc)
+    return future
+
+
+def _open_archive(args: argparse.Namespace) -> "FeedArchive | None":
+    if not getattr(args, "archive", ""):
+        return None
+    from aggregator.archive import FeedArchive
+
+    return FeedArchive(args.archive, codec=args.archive_codec, max_bytes=args.archive_max_mb * 1024 * 1024)
+
+
+def _store_feed(args: argparse.Namespace, name: str, iocs: list[IOC], timings: dict, logger) -> int:
+    """Upsert one feed's IOCs and record its ingest metrics and timings."""
+    with timed(timings, "upsert"):
+        inserted = upsert_iocs(args.db, iocs)
+
+    for stage in INGEST_STAGES:
+        if stage in timings:
+            INGEST_STAGE_SECONDS.observe(timings[stage], feed=name, stage=stage)
+    INGEST_BYTES.inc(timings.get("bytes", 0), feed=name)
+    INGEST_ROWS_INSERTED.inc(inserted, feed=name)
+    INGEST_DUPLICATES.inc(len(iocs) - inserted, feed=name)
+    INGEST_RUN_DUPLICATES.inc(timings.get("run_duplicates", 0), feed=name)
+
+    event = {"event": "feed_run", "feed": name, "iocs": len(iocs), "inserted": inserted}
+    event.update({key: round(value, 6) if isinstance(value, float) else value for key, value in timings.items()})
+    logger.info(
+        "feed=%s items=%d iocs=%d dedupe=%.1f%% inserted=%d fetch=%.3fs parse=%.3fs normalize=%.3fs upsert=%.3fs",
+        name,
+        timings.get("items", 0),
+        len(iocs),
+        timings.get("dedupe_ratio", 0.0) * 100,
+        inserted,
+        timings.get("fetch", 0.0),
+        timings.get("parse", 0.0),
+        timings.get("normalize", 0.0),
+        timings.get("upsert", 0.0),
+        extra={"event": event},
+    )
+    return inserted
+
+
+def _record_failure(name: str, exc: Exception, logger) -> None:
+    INGEST_FAILURES.inc(feed=name)
+    logger.warning(
+        "fetch failed name=%s error=%s",
+        name,
+        exc,
+        extra={"event": {"event": "feed_failed", "feed": name, "error": str(exc)}},
+    )
+
+
+def _write_snapshot(args: argparse.Namespace, logger) -> None:
+    """Write the lookup snapshot to ``--snapshot``, or next to the DB where the app reads it."""
+    if getattr(args, "no_snapshot", False):
+        return
+    from aggregator.snapshot import SNAPSHOT_FILE, write_snapshot
+
+    path = getattr(args, "snapshot", "") or state_path(args.db, SNAPSHOT_FILE)
+    started = time.perf_counter()
+    info = write_snapshot(args.db, path)
+    logger.info(
+        "snapshot written path=%s values=%d ranges=%d bytes=%d seconds=%.3f",
+        path,
+        info["values"],
+        info["ipv4_ranges"] + info["ipv6_ranges"],
+        info["bytes"],
+        time.perf_counter() - started,
+        extra={"event": {"event": "snapshot_written", "path": path, **info}},
+    )
+
+
+def _profiled(args: argparse.Namespace, label: str):
+    """Profile a block when ``--profile`` is set, otherwise do nothing."""
+    if not getattr(args, "profile", False):
+        return contextlib.nullcontext()
+    from aggregator.profiling import Profiler
+
+    return Profiler(args.profile_dir, label, top=args.profile_top, keep=args.profile_keep)
 
 
 def _fetch_once(args: argparse.Namespace) -> tuple[int, int]:
     feeds = load_feeds_config(args.feeds)
     logger = configure_logging(args.log)
-    all_iocs = []
+    total = 0
+    inserted = 0
     max_total = args.max_total if args.max_total is not None else 0
 
+    seen: set[tuple[str, str, str]] = set()
+    archive = _open_archive(args)
+
     logger.info("starting fetch feeds=%d", len(feeds))
     for feed in feeds:
         name = feed["name"]
-        url = feed["url"]
-        feed_format = feed["format"]
-        severity = feed.get("severity")
-        headers = feed.get("headers")
-
-        try:
-            raw_text = fetch_feed(
-                url,
-                headers=headers,
-                timeout=args.timeout,
-                retries=args.retries,
-                backoff=args.backoff,
-            )
-        except Exception as exc:
-            logger.warning("fetch failed name=%s error=%s", name, exc)
-            continue
-
-        items = list(parse_feed(raw_text, feed_format))
-        iocs = normalize_items(items, source=name, default_severity=severity)
+        if max_total and total >= max_total:
+            logger.info("max total reached, stopping ingest")
+            break
 
-        if args.max_per_feed and len(iocs) > args.max_per_feed:
-            iocs = iocs[: args.max_per_feed]
+        timings: dict = {}
+        with _profiled(args, f"fetch-{name}"):
+            try:
+                iocs = _ingest_feed(feed, args, timings, seen, archive)
+            except Exception as exc:
+                _record_failure(name, exc, logger)
+                continue
 
-        if max_total:
-            remaining = max_total - len(all_iocs)
-            if remaining <= 0:
-                logger.info("max total reached, stopping ingest")
-                break
-            if len(iocs) > remaining:
-                iocs = iocs[:remaining]
+            if max_total and len(iocs) > max_total - total:
+                iocs = iocs[: max_total - total]
 
-        all_iocs.extend(iocs)
-        logger.info("feed=%s items=%d iocs=%d", name, len(items), len(iocs))
+            inserted += _store_feed(args, name, iocs, timings, logger)
+            total += len(iocs)
 
-    inserted = upsert_iocs(args.db, all_iocs)
     if args.export_json:
         export_iocs(args.db, args.export_json)
         logger.info("exported json path=%s", args.export_json)
-    logger.info("run summary total=%d inserted=%d", len(all_iocs), inserted)
-    return inserted, len(all_iocs)
+    _write_snapshot(args, logger)
+    INGEST_REGISTRY.write_textfile(state_path(args.db, INGEST_METRICS_FILE))
+    logger.info(
+        "run summary total=%d inserted=%d",
+        total,
+        inserted,
+        extra={"event": {"event": "run_summary", "total": total, "inserted": inserted}},
+    )
+    return inserted, total
 
 
 def cmd_fetch(args: argparse.Namespace) -> int:
@@ -70,34 +306,254 @@ def cmd_fetch(args: argparse.Namespace) -> int:
 
 
 def cmd_schedule(args: argparse.Namespace) -> int:
+    from aggregator.scheduler import SCHEDULE_STATUS_FILE, FeedScheduler
+
+    feeds = load_feeds_config(args.feeds)
     logger = configure_logging(args.log)
-    iteration = 0
-    while True:
-        iteration += 1
-        logger.info("schedule tick=%d", iteration)
-        _fetch_once(args)
-        if args.iterations and iteration >= args.iterations:
-            logger.info("schedule complete iterations=%d", iteration)
-            break
-        time.sleep(args.interval)
+    write_lock = threading.Lock()
+    stored = threading.Event()
+    archive = _open_archive(args)
+
+    def run_feed(feed: dict) -> dict:
+        with _profiled(args, f"schedule-{feed['name']}"):
+            return _run_feed(feed)
+
+    def _run_feed(feed: dict) -> dict:
+        timings: dict = {}
+        try:
+            iocs = _ingest_feed(feed, args, timings, set(), archive)
+        except Exception as exc:
+            _record_failure(feed["name"], exc, logger)
+            raise
+        if args.max_total and len(iocs) > args.max_total:
+            iocs = iocs[: args.max_total]
+        # SQLite allows a single writer; fetch and parse run concurrently, writes do not.
+        with write_lock:
+            inserted = _store_feed(args, feed["name"], iocs, timings, logger)
+            INGEST_REGISTRY.write_textfile(state_path(args.db, INGEST_METRICS_FILE))
+        stored.set()
+        return {"iocs": len(iocs), "inserted": inserted}
+
+    def publish() -> None:
+        # Export and snapshot read the whole store, so refresh them once per scheduler
+        # pass (when no feed is running) instead of after every feed.
+        if not stored.is_set():
+            return
+        stored.clear()
+        with write_lock:
+            if args.export_json:
+                export_iocs(args.db, args.export_json)
+                logger.info("exported json path=%s", args.export_json)
+            _write_snapshot(args, logger)
+
+    scheduler = FeedScheduler(
+        feeds,
+        run_feed,
+        default_interval=args.interval,
+        concurrency=args.concurrency,
+        iterations=args.iterations,
+        max_backoff=args.max_backoff,
+        status_path=args.status_file or state_path(args.db, SCHEDULE_STATUS_FILE),
+        logger=logger,
+        on_idle=publish,
+    )
+    logger.info("schedule start feeds=%d concurrency=%d", len(feeds), args.concurrency)
+    scheduler.run()
+    logger.info("schedule complete iterations=%d", args.iterations)
     return 0
 
 
-def cmd_search(args: argparse.Namespace) -> int:
-    results = search_iocs(
-        args.db,
-        query=args.query,
-        ioc_type=args.type,
-        source=args.source,
-        severity=args.severity,
-        limit=args.limit,
+def cmd_replay(args: argparse.Namespace) -> int:
+    """Re-run parse -> normalize -> upsert from archived feed bodies."""
+    from aggregator.archive import FeedArchive
+
+    logger = configure_logging(args.log)
+    archive = FeedArchive(args.archive)
+    entries = archive.entries(since=args.since, until=args.until, feeds=args.feed or ())
+    workers = max(args.workers, 1)
+    seen: set[tuple[str, str, str]] = set()
+    total = 0
+    inserted = 0
+
+    logger.info("replay start entries=%d workers=%d", len(entries), workers)
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+
+            executor = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+            submit = executor.submit
+        else:
+            submit = _run_now
+
+        # Keep a bounded window of entries in flight so parsed batches do not pile up.
+        pending: collections.deque = collections.deque()
+        queue = iter(entries)
+        for entry in itertools.islice(queue, workers * 2):
+            pending.append((entry, submit(_replay_entry, args.archive, entry)))
+        while pending:
+            entry, future = pending.popleft()
+            for next_entry in itertools.islice(queue, 1):
+                pending.append((next_entry, submit(_replay_entry, args.archive, next_entry)))
+            try:
+                normalized, timings = future.result()
+            except Exception as exc:
+                _record_failure(entry["feed"], exc, logger)
+                continue
+            iocs = _dedupe(normalized, seen, timings)
+            if args.max_per_feed and len(iocs) > args.max_per_feed:
+                iocs = iocs[: args.max_per_feed]
+            inserted += _store_feed(args, entry["feed"], iocs, timings, logger)
+            total += len(iocs)
+
+    elapsed = time.perf_counter() - started
+    _write_snapshot(args, logger)
+    INGEST_REGISTRY.write_textfile(state_path(args.db, INGEST_METRICS_FILE))
+    logger.info(
+        "replay summary entries=%d total=%d inserted=%d seconds=%.3f",
+        len(entries),
+        total,
+        inserted,
+        elapsed,
+        extra={
+            "event": {
+                "event": "replay_summary",
+                "entries": len(entries),
+                "total": total,
+                "inserted": inserted,
+                "seconds": round(elapsed, 6),
+            }
+        },
     )
+    print(f"Replayed {len(entries)} archived downloads in {elapsed:.2f}s")
+    print(f"Inserted {inserted} IOC source records into {args.db}")
+    return 0
+
+
+def cmd_shard(args: argparse.Namespace) -> int:
+    """Create a sharded store, optionally copying every source record from an existing database."""
+    if args.source and not os.path.isfile(args.source):
+        print(f"Source database not found: {args.source}", file=sys.stderr)
+        return 1
+    try:
+        manifest = create_sharded_store(args.output, shards=args.shards, partition=args.partition)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    copied = 0
+    if args.source:
+        records = (
+            IOC(ioc_type, value, source, severity, date_added)
+            for ioc_type, value, sources in iter_ioc_records(args.source)
+            for source, severity, date_added in sources
+        )
+        while True:
+            batch = list(itertools.islice(records, args.batch_size))
+            if not batch:
+                break
+            copied += upsert_iocs(args.output, batch)
+    summary = {"path": args.output, "partition": manifest["partition"], "shards": len(manifest["shards"])}
+    print(json.dumps({**summary, "copied_records": copied}))
+    return 0
+
+
+def cmd_search(args: argparse.Namespace) -> int:
+    results = None
+    if args.socket:
+        from aggregator.daemon import request_daemon
+
+        request = {
+            "query": args.query,
+            "type": args.type,
+            "source": args.source,
+            "severity": args.severity,
+            "limit": args.limit,
+        }
+        try:
+            response = request_daemon(args.socket, request)
+        except OSError as exc:
+            print(f"Lookup daemon unavailable ({exc}); searching {args.db} directly", file=sys.stderr)
+        else:
+            if response.get("status") != "success":
+                print(response.get("message", "lookup daemon error"), file=sys.stderr)
+                return 1
+            results = response["data"]
+    if results is None:
+        results = search_iocs(
+            args.db,
+            query=args.query,
+            ioc_type=args.type,
+            source=args.source,
+            severity=args.severity,
+            limit=args.limit,
+        )
     json.dump(results, sys.stdout, indent=2)
     return 0
 
 
+def cmd_serve(args: argparse.Namespace) -> int:
+    """Answer NDJSON search and lookup requests on a Unix socket until stopped."""
+    import signal
+
+    from aggregator.daemon import serve
+
+    # Let SIGTERM from a service manager unwind through serve() so the socket is removed.
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    print(f"Lookup daemon listening on {args.socket} for {args.db}", file=sys.stderr)
+    try:
+        serve(args.db, args.socket, snapshot_path=args.snapshot)
+    except ValueError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def cmd_scan(args: argparse.Namespace) -> int:
+    """Match IOCs found in log files against the database, writing hits as NDJSON."""
+    from aggregator.scan import load_matcher, scan_files
+
+    started = time.perf_counter()
+    matcher = load_matcher(args.db)
+    loaded = time.perf_counter() - started
+
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    hits = lines = scanned = 0
+    started = time.perf_counter()
+    try:
+        for range_hits, range_lines, range_bytes in scan_files(
+            matcher, args.files, workers=args.workers, chunk_bytes=args.chunk_mb * 1024 * 1024
+        ):
+            for hit in range_hits:
+                output.write(json.dumps(hit) + "\n")
+            hits += len(range_hits)
+            lines += range_lines
+            scanned += range_bytes
+    finally:
+        if args.output:
+            output.close()
+    elapsed = time.perf_counter() - started
+
+    summary = {
+        "iocs": len(matcher),
+        "load_seconds": round(loaded, 3),
+        "files": len(args.files),
+        "lines": lines,
+        "bytes": scanned,
+        "hits": hits,
+        "seconds": round(elapsed, 3),
+        "lines_per_second": round(lines / elapsed) if elapsed else 0,
+        "mb_per_second": round(scanned / elapsed / 1e6, 1) if elapsed else 0.0,
+    }
+    print(json.dumps(summary), file=sys.stderr)
+    return 0
+
+
 def cmd_dashboard(args: argparse.Namespace) -> int:
     """Run the Flask dashboard server."""
+    from aggregator.app import create_app
+
     app = create_app(args.db)
     app.run(host=args.host, port=args.port, debug=args.debug)
     return 0
@@ -105,6 +561,42 @@ def cmd_dashboard(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_bench(args: argparse.Namespace) -> int:
+    """Benchmark the ingest pipeline, searches, export and API on a synthetic corpus."""
+    from aggregator.bench import run_benchmarks
+
+    report = run_benchmarks(
+        size=args.size,
+        seed=args.seed,
+        repeat=args.repeat,
+        workdir=args.workdir,
+        parse_memory_mb=args.parse_memory_mb,
+        shards=args.shards,
+    )
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"Wrote benchmark report to {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+    return 0
+
+
+def _add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--profile", action="store_true", help="Write cProfile/tracemalloc reports per feed run")
+    parser.add_argument("--profile-dir", default=PROFILE_DIR, help="Profile output directory")
+    parser.add_argument("--profile-keep", type=int, default=PROFILE_KEEP, help="Profile runs to keep")
+    parser.add_argument("--profile-top", type=int, default=PROFILE_TOP, help="Allocation sites to report")
+
+
+def _add_archive_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--archive", default="", help="Store raw feed bodies in this directory for replay")
+    parser.add_argument("--archive-codec", choices=ARCHIVE_CODECS, default="gzip", help="Archive compression")
+    parser.add_argument(
+        "--archive-max-mb", type=int, default=ARCHIVE_MAX_BYTES // (1024 * 1024), help="Archive size cap in MB"
+    )
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Threat feed aggregator CLI")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -119,22 +611,64 @@ def build_parser() -> argparse.ArgumentParser:
     fetch_parser.add_argument("--retries", type=int, default=3, help="HTTP retries")
     fetch_parser.add_argument("--backoff", type=float, default=0.5, help="Retry backoff factor")
     fetch_parser.add_argument("--log", default="logs/ingest.log", help="Log file path")
+    fetch_parser.add_argument(
+        "--snapshot", default="", help="Lookup snapshot written after ingest (default: next to the DB)"
+    )
+    fetch_parser.add_argument("--no-snapshot", action="store_true", help="Do not write a lookup snapshot")
+    _add_archive_arguments(fetch_parser)
+    _add_profile_arguments(fetch_parser)
     fetch_parser.set_defaults(func=cmd_fetch)
 
     schedule_parser = subparsers.add_parser("schedule", help="Fetch feeds on an interval")
     schedule_parser.add_argument("--feeds", required=True, help="Path to feeds.json")
     schedule_parser.add_argument("--db", required=True, help="Path to SQLite DB")
     schedule_parser.add_argument("--export-json", default="", help="Optional JSON export path")
-    schedule_parser.add_argument("--interval", type=int, default=3600, help="Interval in seconds")
-    schedule_parser.add_argument("--iterations", type=int, default=0, help="0 = run forever")
-    schedule_parser.add_argument("--max-total", type=int, default=200000, help="Cap total IOCs per run")
+    schedule_parser.add_argument("--interval", type=int, default=3600, help="Default per-feed interval in seconds")
+    schedule_parser.add_argument("--iterations", type=int, default=0, help="Runs per feed (0 = run forever)")
+    schedule_parser.add_argument("--concurrency", type=int, default=4, help="Max feeds fetched at once")
+    schedule_parser.add_argument(
+        "--max-backoff", type=int, default=SCHEDULE_MAX_BACKOFF, help="Max retry delay for failing feeds in seconds"
+    )
+    schedule_parser.add_argument("--status-file", default="", help="Scheduler status JSON (default: next to DB)")
+    schedule_parser.add_argument("--max-total", type=int, default=200000, help="Cap IOCs per feed run")
     schedule_parser.add_argument("--max-per-feed", type=int, default=0, help="Cap IOCs per feed (0 = no cap)")
     schedule_parser.add_argument("--timeout", type=int, default=20, help="HTTP timeout in seconds")
     schedule_parser.add_argument("--retries", type=int, default=3, help="HTTP retries")
     schedule_parser.add_argument("--backoff", type=float, default=0.5, help="Retry backoff factor")
     schedule_parser.add_argument("--log", default="logs/ingest.log", help="Log file path")
+    schedule_parser.add_argument(
+        "--snapshot", default="", help="Lookup snapshot written after each pass (default: next to the DB)"
+    )
+    schedule_parser.add_argument("--no-snapshot", action="store_true", help="Do not write a lookup snapshot")
+    _add_archive_arguments(schedule_parser)
+    _add_profile_arguments(schedule_parser)
     schedule_parser.set_defaults(func=cmd_schedule)
 
+    replay_parser = subparsers.add_parser("replay", help="Re-ingest archived feed bodies without fetching")
+    replay_parser.add_argument("--archive", required=True, help="Archive directory written by --archive")
+    replay_parser.add_argument("--db", required=True, help="Path to SQLite DB")
+    replay_parser.add_argument("--since", default="", help="First fetch date to replay (YYYY-MM-DD)")
+    replay_parser.add_argument("--until", default="", help="Last fetch date to replay (YYYY-MM-DD)")
+    replay_parser.add_argument("--feed", action="append", help="Only replay this feed (repeatable)")
+    replay_parser.add_argument("--workers", type=int, default=1, help="Parallel parse/normalize processes")
+    replay_parser.add_argument("--max-per-feed", type=int, default=0, help="Cap IOCs per feed (0 = no cap)")
+    replay_parser.add_argument(
+        "--snapshot", default="", help="Lookup snapshot written after replay (default: next to the DB)"
+    )
+    replay_parser.add_argument("--no-snapshot", action="store_true", help="Do not write a lookup snapshot")
+    replay_parser.add_argument("--log", default="logs/ingest.log", help="Log file path")
+    replay_parser.set_defaults(func=cmd_replay)
+
+    shard_parser = subparsers.add_parser("shard", help="Create a sharded store (optionally from an existing DB)")
+    shard_parser.add_argument("--output", required=True, help="Directory for the shards and shards.json")
+    shard_parser.add_argument("--shards", type=int, default=4, help="Shard count for hash partitioning")
+    shard_parser.add_argument(
+        "--partition", choices=SHARD_PARTITIONS, default="hash", help="Partition by value hash or by type"
+    )
+    shard_parser.add_argument("--source", default="", help="Copy IOCs from this single-file DB")
+    shard_parser.add_argument("--batch-size", type=int, default=50000, help="Records per upsert batch when copying")
+    shard_parser.set_defaults(func=cmd_shard)
+
     search_parser = subparsers.add_parser("search", help="Search IOC database")
     search_parser.add_argument("--db", required=True, help="Path to SQLite DB")
     search_parser.add_argument("--query", default="", help="Substring search on value")
@@ -142,8 +676,27 @@ def build_parser() -> argparse.ArgumentParser:
     search_parser.add_argument("--source", default="", help="Filter by source")
     search_parser.add_argument("--severity", default="", help="Filter by severity")
     search_parser.add_argument("--limit", type=int, default=200, help="Max results")
+    search_parser.add_argument(
+        "--socket", default="", help="Ask the lookup daemon on this socket first (falls back to --db)"
+    )
     search_parser.set_defaults(func=cmd_search)
 
+    serve_parser = subparsers.add_parser("serve", help="Run the lookup daemon on a Unix socket")
+    serve_parser.add_argument("--db", required=True, help="Path to SQLite DB")
+    serve_parser.add_argument("--socket", required=True, help="Unix socket path to listen on")
+    serve_parser.add_argument("--snapshot", default="", help="Lookup snapshot (default: next to the DB)")
+    serve_parser.set_defaults(func=cmd_serve)
+
+    scan_parser = subparsers.add_parser("scan", help="Match log files against the IOC database")
+    scan_parser.add_argument("files", nargs="+", help="Log files to scan (.gz is streamed)")
+    scan_parser.add_argument("--db", required=True, help="Path to SQLite DB")
+    scan_parser.add_argument("--output", default="", help="Write NDJSON hits here (default: stdout)")
+    scan_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Scanner processes")
+    scan_parser.add_argument(
+        "--chunk-mb", type=int, default=SCAN_CHUNK_BYTES // (1024 * 1024), help="File range size per task in MB"
+    )
+    scan_parser.set_defaults(func=cmd_scan)
+
     dashboard_parser = subparsers.add_parser("dashboard", help="Run Flask dashboard with REST API")
     dashboard_parser.add_argument("--db", required=True, help="Path to SQLite DB")
     dashboard_parser.add_argument("--host", default="127.0.0.1", help="Server host")
@@ -151,6 +704,18 @@ def build_parser() -> argparse.ArgumentParser:
     dashboard_parser.add_argument("--debug", action="store_true", help="Enable debug mode")
     dashboard_parser.set_defaults(func=cmd_dashboard)
 
+    bench_parser = subparsers.add_parser("bench", help="Benchmark pipeline, search and API on synthetic feeds")
+    bench_parser.add_argument("--size", type=int, default=10000, help="Synthetic corpus size in IOCs (10k-10M)")
+    bench_parser.add_argument("--seed", type=int, default=1, help="Random seed for the corpus")
+    bench_parser.add_argument("--repeat", type=int, default=5, help="Repetitions for search and API timings")
+    bench_parser.add_argument("--workdir", default="", help="Keep corpus and DB here (default: temp dir, removed)")
+    bench_parser.add_argument(
+        "--parse-memory-mb", type=int, default=0, help="Also compare buffered vs streaming parse memory on N MB feeds"
+    )
+    bench_parser.add_argument("--shards", type=int, default=0, help="Benchmark a hash-sharded store with N shards")
+    bench_parser.add_argument("--output", default="", help="Write JSON report here (default: stdout)")
+    bench_parser.set_defaults(func=cmd_bench)
+
     return parser
 
 
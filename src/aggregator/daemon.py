@@ -0,0 +1,120 @@
+import json
+import os
+import socket
+import socketserver
+import stat
+
+from aggregator.snapshot import SNAPSHOT_FILE, SnapshotReader
+from aggregator.store import init_db, search_iocs
+from aggregator.utils import state_path
+
+# Request keys accepted by the search op, mapped to search_iocs arguments.
+SEARCH_FIELDS = {
+    "query": "query",
+    "type": "ioc_type",
+    "source": "source",
+    "severity": "severity",
+    "search_mode": "search_mode",
+    "date_from": "date_from",
+    "date_to": "date_to",
+    "sort": "sort",
+    "min_sources": "min_sources",
+    "limit": "limit",
+    "offset": "offset",
+}
+DEFAULT_LIMIT = 200
+MAX_REQUEST_BYTES = 64 * 1024
+
+
+def handle_request(db_path: str, snapshots: SnapshotReader, request: dict) -> dict:
+    """Answer one daemon request: ``search`` (the default), ``lookup`` or ``ping``."""
+    op = request.get("op", "search")
+    if op == "search":
+        filters = {SEARCH_FIELDS[key]: value for key, value in request.items() if key in SEARCH_FIELDS}
+        filters.setdefault("limit", DEFAULT_LIMIT)
+        return {"status": "success", "data": search_iocs(db_path, **filters)}
+    if op == "lookup":
+        snapshot = snapshots.get()
+        if snapshot is None:
+            return {"status": "error", "message": "lookup snapshot not available"}
+        return {"status": "success", "data": snapshot.lookup(str(request.get("value", "")))}
+    if op == "ping":
+        return {"status": "success", "data": {"db": db_path}}
+    raise ValueError(f"Unsupported op: {op}")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """NDJSON over the connection: one request object per line, one response line each."""
+
+    def handle(self) -> None:
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES)
+            if not line:
+                return
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                response = handle_request(self.server.db_path, self.server.snapshots, request)
+            except Exception as exc:
+                response = {"status": "error", "message": str(exc)}
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+def _remove_stale_socket(socket_path: str) -> None:
+    """Remove a socket file left behind by a daemon that is no longer listening."""
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"Not a socket: {socket_path}")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+            return
+    raise ValueError(f"A lookup daemon is already listening on {socket_path}")
+
+
+def create_server(db_path: str, socket_path: str, snapshot_path: str = "") -> socketserver.BaseServer:
+    """Bind a threaded lookup daemon to a Unix socket only the current user can connect to."""
+    if not hasattr(socketserver, "ThreadingUnixStreamServer"):
+        raise ValueError("The lookup daemon needs Unix domain sockets, which this platform lacks")
+    init_db(db_path)
+    _remove_stale_socket(socket_path)
+    umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, _RequestHandler)
+    finally:
+        os.umask(umask)
+    server.daemon_threads = True
+    server.db_path = db_path
+    server.snapshots = SnapshotReader(snapshot_path or state_path(db_path, SNAPSHOT_FILE))
+    return server
+
+
+def serve(db_path: str, socket_path: str, snapshot_path: str = "") -> None:
+    server = create_server(db_path, socket_path, snapshot_path)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def request_daemon(socket_path: str, request: dict, timeout: float = 30.0) -> dict:
+    """Send one request to a running daemon and return its decoded response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.settimeout(timeout)
+        client.connect(socket_path)
+        client.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with client.makefile("rb") as reader:
+            line = reader.readline()
+    if not line:
+        raise ConnectionError("lookup daemon closed the connection without a response")
+    return json.loads(line)
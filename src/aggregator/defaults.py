@@ -0,0 +1,14 @@
+"""Default settings that the CLI argument parser shows and validates against.
+
+This module imports nothing, so building the parser does not load the archive,
+profiler, scheduler or scanner. Those modules re-export the values under their
+own names.
+"""
+
+ARCHIVE_CODECS = ("gzip", "zstd")
+ARCHIVE_MAX_BYTES = 2 * 1024 * 1024 * 1024
+PROFILE_DIR = "logs/profiles"
+PROFILE_KEEP = 50
+PROFILE_TOP = 25
+SCAN_CHUNK_BYTES = 64 * 1024 * 1024
+SCHEDULE_MAX_BACKOFF = 6 * 3600
@@ -1,9 +1,14 @@
-from typing import Mapping
+import re
+from typing import Iterator, Mapping
 
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+CHUNK_SIZE = 64 * 1024
+
+CHARSET_RE = re.compile(r'charset\s*=\s*"?([^";\s]+)', re.IGNORECASE)
+
 DEFAULT_HEADERS = {
     "User-Agent": "ThreatFeedAggregator/1.0",
     "Accept": "*/*",
@@ -31,6 +36,7 @@ def fetch_feed(
     timeout: int = 20,
     retries: int = 3,
     backoff: float = 0.5,
+    stats: dict | None = None,
 ) -> str:
     session = _build_session(retries=retries, backoff=backoff)
     merged_headers = dict(DEFAULT_HEADERS)
@@ -38,4 +44,37 @@ def fetch_feed(
         merged_headers.update(headers)
     response = session.get(url, timeout=timeout, headers=merged_headers)
     response.raise_for_status()
+    if stats is not None:
+        stats["bytes"] = len(response.content)
     return response.text
+
+
+def fetch_feed_stream(
+    url: str,
+    headers: Mapping[str, str] | None = None,
+    timeout: int = 20,
+    retries: int = 3,
+    backoff: float = 0.5,
+    stats: dict | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Yield the (decompressed) response body in chunks as it downloads.
+
+    The request is sent when iteration starts; HTTP errors are raised from
+    the first ``next()``. ``stats["bytes"]`` accumulates the body size and
+    ``stats["encoding"]`` is the charset declared in Content-Type (None when
+    the server did not declare one), set before the first chunk is yielded.
+    """
+    session = _build_session(retries=retries, backoff=backoff)
+    merged_headers = dict(DEFAULT_HEADERS)
+    if headers:
+        merged_headers.update(headers)
+    with session.get(url, timeout=timeout, headers=merged_headers, stream=True) as response:
+        response.raise_for_status()
+        if stats is not None:
+            match = CHARSET_RE.search(response.headers.get("Content-Type", ""))
+            stats["encoding"] = match.group(1) if match else None
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            if stats is not None:
+                stats["bytes"] = stats.get("bytes", 0) + len(chunk)
+            yield chunk
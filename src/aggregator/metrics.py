@@ -0,0 +1,206 @@
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+ROW_BUCKETS = (10, 100, 1000, 10000, 100000, 1000000, 10000000)
+INGEST_METRICS_FILE = "ingest_metrics.prom"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: dict[tuple[str, ...], object] = {}
+
+    def _key(self, labels: dict) -> tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            lines.extend(self._render_sample(key, value))
+        return lines
+
+    @abstractmethod
+    def _render_sample(self, key: tuple[str, ...], value: object) -> list[str]:
+        """Exposition lines for one label set."""
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_sample(self, key: tuple[str, ...], value: object) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_sample(self, key: tuple[str, ...], value: object) -> list[str]:
+        counts, total, count = value
+        lines = []
+        for bound, bucket_count in zip(self.buckets, counts):
+            labels = _format_labels(self.labelnames, key, f'le="{_format_number(bound)}"')
+            lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+        labels = _format_labels(self.labelnames, key)
+        lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+        lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: list[_Metric] = []
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Atomically write the registry for another process to serve."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            handle.write(self.render())
+        os.replace(temp_path, path)
+
+
+# Process-local metrics served directly by the dashboard process.
+REGISTRY = Registry()
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "aggregator_http_request_seconds", "REST/dashboard request latency", ("endpoint", "method", "status")
+)
+SEARCH_QUERY_SECONDS = REGISTRY.histogram(
+    "aggregator_search_query_seconds", "SQLite query time in search_iocs", ("mode",)
+)
+SEARCH_ROWS_SCANNED = REGISTRY.histogram(
+    "aggregator_search_rows_scanned", "Rows read from SQLite per search_iocs call", ("mode",), ROW_BUCKETS
+)
+
+# Ingest metrics, written by fetch/schedule to INGEST_METRICS_FILE next to the DB.
+INGEST_REGISTRY = Registry()
+INGEST_STAGE_SECONDS = INGEST_REGISTRY.histogram(
+    "aggregator_ingest_stage_seconds", "Per-feed ingest stage duration", ("feed", "stage")
+)
+INGEST_BYTES = INGEST_REGISTRY.counter("aggregator_ingest_bytes_total", "Bytes downloaded per feed", ("feed",))
+INGEST_ROWS_INSERTED = INGEST_REGISTRY.counter(
+    "aggregator_ingest_rows_inserted_total", "IOC source records inserted per feed", ("feed",)
+)
+INGEST_DUPLICATES = INGEST_REGISTRY.counter(
+    "aggregator_ingest_duplicates_skipped_total", "IOC source records already present per feed", ("feed",)
+)
+INGEST_RUN_DUPLICATES = INGEST_REGISTRY.counter(
+    "aggregator_ingest_run_duplicates_total", "IOCs dropped as duplicates within a run before upsert", ("feed",)
+)
+INGEST_FAILURES = INGEST_REGISTRY.counter("aggregator_ingest_failures_total", "Failed feed runs", ("feed",))
+
+
+@contextmanager
+def timed(timings: dict, stage: str) -> Iterator[None]:
+    """Record the wall time of a block into ``timings[stage]`` in seconds."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - started
+
+
+def timed_iter(iterable: Iterable[T], timings: dict, stage: str, count_key: str = "") -> Iterator[T]:
+    """Yield from ``iterable``, adding the time spent producing items to ``timings[stage]``.
+
+    Used to split the stages of a streaming pipeline, where downloading,
+    parsing and normalizing interleave. ``count_key`` optionally counts items.
+    """
+    iterator = iter(iterable)
+    timings.setdefault(stage, 0.0)
+    if count_key:
+        timings.setdefault(count_key, 0)
+    while True:
+        started = time.perf_counter()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            timings[stage] += time.perf_counter() - started
+        if count_key:
+            timings[count_key] += 1
+        yield item
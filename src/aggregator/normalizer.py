@@ -1,50 +1,180 @@
 import datetime as dt
 import ipaddress
 import re
-from typing import Iterable
+import sys
+from typing import Iterable, NamedTuple
+from urllib.parse import urlsplit, urlunsplit
 
-DOMAIN_RE = re.compile(r"^(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,}$")
+DOMAIN_RE = re.compile(r"^(?:[a-zA-Z0-9-]+\.)+(?:[a-zA-Z]{2,}|xn--[a-zA-Z0-9-]+)$")
+DEFAULT_PORTS = {"http": 80, "https": 443, "ftp": 21}
 
 
-def detect_type(value: str) -> str:
+class IOC(NamedTuple):
+    """A normalized IOC record.
+
+    A tuple subclass with no per-instance ``__dict__``; ``type``, ``source``
+    and ``severity`` are interned and ``date_added`` is shared per feed run,
+    so large batches cost little more than their ``value`` strings.
+    """
+
+    type: str
+    value: str
+    source: str
+    severity: str
+    date_added: str
+
+
+def utc_timestamp() -> str:
+    return dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+
+
+def _canonical_domain(value: str) -> str:
+    """Lowercase, drop the root dot and IDNA-encode a hostname ("" if it cannot be encoded)."""
+    host = value.rstrip(".").lower()
+    if not host.isascii():
+        try:
+            host = host.encode("idna").decode("ascii")
+        except UnicodeError:
+            return ""
+    return host
+
+
+def _canonical_address(value: str) -> str:
+    address = ipaddress.ip_address(value)
+    if address.version == 6 and address.ipv4_mapped:
+        return str(address.ipv4_mapped)
+    return str(address)
+
+
+def _canonical_network(network: ipaddress.IPv4Network | ipaddress.IPv6Network) -> str:
+    if network.prefixlen == network.max_prefixlen:
+        return str(network.network_address)
+    return str(network)
+
+
+def _canonical_url(value: str) -> str:
+    try:
+        parts = urlsplit(value)
+        port = parts.port
+    except ValueError:
+        return value
+    host = parts.hostname
+    if not host:
+        return value
+
+    scheme = parts.scheme.lower()
+    if ":" in host:
+        try:
+            host = _canonical_address(host)
+        except ValueError:
+            pass
+        host = f"[{host}]"
+    else:
+        host = _canonical_domain(host) or host
+
+    netloc = host
+    if port is not None and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{netloc}:{port}"
+    if "@" in parts.netloc:
+        netloc = parts.netloc.rpartition("@")[0] + "@" + netloc
+
+    path = parts.path
+    if path == "/" and not parts.query and not parts.fragment:
+        path = ""
+    return urlunsplit((scheme, netloc, path, parts.query, parts.fragment))
+
+
+def _classify(value: str) -> tuple[str, str]:
+    """Return ``(type, canonical value)``, parsing the value only once."""
     try:
-        ipaddress.ip_address(value)
-        return "ip"
+        return "ip", _canonical_address(value)
     except ValueError:
         pass
 
     try:
-        ipaddress.ip_network(value, strict=False)
-        return "ip"
+        return "ip", _canonical_network(ipaddress.ip_network(value, strict=False))
     except ValueError:
         pass
 
     if "://" in value:
-        return "url"
+        return "url", _canonical_url(value)
+
+    domain = _canonical_domain(value)
+    if domain and DOMAIN_RE.match(domain):
+        return "domain", domain
+
+    return "unknown", value
+
+
+def detect_type(value: str) -> str:
+    return _classify(value)[0]
+
+
+def canonicalize(ioc_type: str, value: str) -> str:
+    """Canonicalize a value so equivalent spellings of one IOC compare equal.
+
+    IPs use their compressed form (IPv4-mapped IPv6 becomes plain IPv4),
+    single-host CIDRs collapse to the address and networks have host bits
+    masked; domains are lowercased, lose the root dot and are IDNA-encoded;
+    URLs get a lowercase scheme/host, no default port and no bare trailing
+    slash.
+    """
+    if ioc_type == "ip":
+        try:
+            return _canonical_address(value)
+        except ValueError:
+            pass
+        try:
+            return _canonical_network(ipaddress.ip_network(value, strict=False))
+        except ValueError:
+            return value
+    if ioc_type == "domain":
+        return _canonical_domain(value) or value
+    if ioc_type == "url":
+        return _canonical_url(value)
+    return value
 
-    if DOMAIN_RE.match(value):
-        return "domain"
 
-    return "unknown"
+def dedupe_iocs(iocs: Iterable[IOC], seen: set[tuple[str, str, str]]) -> list[IOC]:
+    """Drop IOCs whose (type, value, source) is already in ``seen``, recording new ones."""
+    unique = []
+    for ioc in iocs:
+        key = (ioc.type, ioc.value, ioc.source)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append(ioc)
+    return unique
 
 
-def normalize_item(item: object, source: str, default_severity: str | None) -> dict | None:
-    now = dt.datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
+def _intern(value: object) -> object:
+    """Intern strings; feeds occasionally send other JSON scalars, which are stored as-is."""
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def normalize_item(
+    item: object,
+    source: str,
+    default_severity: str | None,
+    now: str | None = None,
+) -> IOC | None:
+    if now is None:
+        now = utc_timestamp()
 
     if isinstance(item, str):
         value = item.strip()
         if not value:
             return None
-        ioc_type = detect_type(value)
+        ioc_type, value = _classify(value)
         if ioc_type == "unknown":
             return None
-        return {
-            "type": ioc_type,
-            "value": value,
-            "source": source,
-            "severity": default_severity or "medium",
-            "date_added": now,
-        }
+        return IOC(
+            sys.intern(ioc_type),
+            value,
+            sys.intern(source),
+            sys.intern(default_severity or "medium"),
+            now,
+        )
 
     if isinstance(item, dict):
         value = (
@@ -58,24 +188,37 @@ def normalize_item(item: object, source: str, default_severity: str | None) -> d
         if not value:
             return None
         value = str(value).strip()
-        ioc_type = item.get("type") or detect_type(value)
+        if item.get("type"):
+            ioc_type = item["type"]
+            value = canonicalize(ioc_type, value)
+        else:
+            ioc_type, value = _classify(value)
         if ioc_type == "unknown":
             return None
-        return {
-            "type": ioc_type,
-            "value": value,
-            "source": source,
-            "severity": item.get("severity") or default_severity or "medium",
-            "date_added": item.get("date_added") or now,
-        }
+        return IOC(
+            _intern(ioc_type),
+            value,
+            _intern(source),
+            _intern(item.get("severity") or default_severity or "medium"),
+            item.get("date_added") or now,
+        )
 
     return None
 
 
-def normalize_items(items: Iterable[object], source: str, default_severity: str | None) -> list[dict]:
+def normalize_items(
+    items: Iterable[object],
+    source: str,
+    default_severity: str | None,
+    now: str | None = None,
+) -> list[IOC]:
+    """Normalize parsed feed items, stamping them all with one run timestamp."""
+    if now is None:
+        now = utc_timestamp()
+    source = sys.intern(source)
     normalized = []
     for item in items:
-        ioc = normalize_item(item, source=source, default_severity=default_severity)
+        ioc = normalize_item(item, source=source, default_severity=default_severity, now=now)
         if ioc:
             normalized.append(ioc)
     return normalized
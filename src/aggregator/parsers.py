@@ -1,51 +1,275 @@
+import codecs
 import csv
-import io
 import json
-from typing import Iterable
+import re
+from typing import Iterable, Iterator
 
+CSV_VALUE_COLUMNS = {"value", "ioc", "indicator", "ip", "domain", "url"}
+JSON_RECORD_KEYS = ("data", "items", "iocs")
 
-def parse_txt(text: str) -> Iterable[str]:
-    for line in text.splitlines():
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_VALUE_DELIMITERS = frozenset(",]} \t\n\r")
+
+
+def _incremental_decoder(encoding: str | None) -> codecs.IncrementalDecoder:
+    """Decoder for a declared charset; UTF-8 (dropping a BOM) when unset or unknown."""
+    try:
+        info = codecs.lookup(encoding or "utf-8")
+    except LookupError:
+        info = codecs.lookup("utf-8")
+    name = "utf-8-sig" if info.name == "utf-8" else info.name
+    return codecs.getincrementaldecoder(name)("replace")
+
+
+def _decode_chunks(chunks: Iterable[bytes | str], encoding: str | None = None) -> Iterator[str]:
+    """Incrementally decode byte chunks in ``encoding`` (default UTF-8, a leading BOM is dropped)."""
+    decoder = _incremental_decoder(encoding)
+    for chunk in chunks:
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _iter_lines(chunks: Iterable[bytes | str], encoding: str | None = None) -> Iterator[str]:
+    """Yield complete "\n"-terminated lines (with their newline) as chunks arrive, for csv."""
+    pending = ""
+    for text in _decode_chunks(chunks, encoding):
+        lines = (pending + text).split("\n")
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    if pending:
+        yield pending
+
+
+def _iter_universal_lines(chunks: Iterable[bytes | str], encoding: str | None = None) -> Iterator[str]:
+    """Yield lines split like ``str.splitlines`` (\n, \r\n, \r, ...) as chunks arrive."""
+    pending = ""
+    for text in _decode_chunks(chunks, encoding):
+        lines = (pending + text).splitlines(keepends=True)
+        pending = ""
+        if lines:
+            last = lines[-1]
+            # An unterminated tail continues in the next chunk, and a trailing "\r" may be
+            # the first half of a "\r\n" split across chunks.
+            if last.endswith("\r") or last.splitlines()[0] == last:
+                pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+class _JsonStream:
+    """Cursor over a JSON document that only buffers the value being decoded."""
+
+    def __init__(self, chunks: Iterable[bytes | str], encoding: str | None = None) -> None:
+        self._texts = _decode_chunks(chunks, encoding)
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        try:
+            text = next(self._texts)
+        except StopIteration:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise ValueError(f"Malformed JSON: expected {char!r} at offset {self.pos}")
+        self.pos += 1
+
+    def value(self) -> object:
+        """Decode and consume one complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A value ending at the buffer edge, or a number followed by anything
+            # but a delimiter (e.g. "-1." of "-1.5"), may continue in the next chunk.
+            incomplete = end == len(self.buffer) or (
+                isinstance(obj, (int, float)) and self.buffer[end] not in _VALUE_DELIMITERS
+            )
+            if incomplete and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def array_items(self) -> Iterator[object]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        decode = _DECODER.raw_decode
+        skip = _WHITESPACE.match
+        while True:
+            # Fast path: a complete element followed by its delimiter is already buffered.
+            buffer, pos = self.buffer, self.pos
+            try:
+                obj, end = decode(buffer, pos)
+                delimiter_pos = skip(buffer, end).end()
+                char = buffer[delimiter_pos] if delimiter_pos < len(buffer) else ""
+            except json.JSONDecodeError:
+                char = ""
+            if char in (",", "]") and (char == "]" or delimiter_pos + 1 < len(buffer)):
+                self.pos = delimiter_pos + 1
+                yield obj
+            else:
+                yield self.value()
+                char = self.peek()
+                self.pos += 1
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"Malformed JSON array at offset {self.pos}")
+            self.pos = skip(self.buffer, self.pos).end()
+
+
+def iter_txt(chunks: Iterable[bytes | str], encoding: str | None = None) -> Iterator[str]:
+    for line in _iter_universal_lines(chunks, encoding):
         stripped = line.strip()
         if not stripped or stripped.startswith("#"):
             continue
         yield stripped
 
 
-def parse_csv(text: str) -> Iterable[dict]:
-    buffer = io.StringIO(text)
-    reader = csv.reader(buffer)
-    rows = list(reader)
-    if not rows:
-        return []
-
-    header = [h.strip().lower() for h in rows[0]]
-    has_header = any(name in {"value", "ioc", "indicator", "ip", "domain", "url"} for name in header)
-
-    if has_header:
-        buffer.seek(0)
-        dict_reader = csv.DictReader(buffer)
-        return list(dict_reader)
-
-    data = []
-    for row in rows:
+def iter_csv(chunks: Iterable[bytes | str], encoding: str | None = None) -> Iterator[dict]:
+    """Single-pass CSV reader.
+
+    The first non-empty row is used as the header when it names a value
+    column (``value``, ``ioc``, ``url``, ...); header names are stripped and
+    lowercased. Otherwise every row's first column is the value.
+    """
+    reader = csv.reader(_iter_lines(chunks, encoding))
+    header = None
+    for row in reader:
         if not row:
             continue
-        data.append({"value": row[0]})
-    return data
+        if header is None:
+            names = [name.strip().lower() for name in row]
+            if any(name in CSV_VALUE_COLUMNS for name in names):
+                header = names
+                continue
+            header = []
+        if not header:
+            yield {"value": row[0]}
+            continue
+        record = dict(zip(header, row))
+        if len(row) > len(header):
+            record[None] = row[len(header):]
+        for name in header[len(row):]:
+            record[name] = None
+        yield record
+
+
+def iter_json(
+    chunks: Iterable[bytes | str],
+    keys: tuple[str, ...] = JSON_RECORD_KEYS,
+    encoding: str | None = None,
+) -> Iterator[object]:
+    """Yield records from a top-level JSON array, or from an array under one of ``keys``.
+
+    Records are decoded one at a time as chunks arrive, so memory is bounded
+    by the largest single record rather than the whole document. For objects
+    ``keys`` are tried in priority order, as in ``parse_json``: the first key
+    streams as soon as it is reached, while a lower-priority array is held
+    until the rest of the object shows no better key follows.
+    """
+    stream = _JsonStream(chunks, encoding)
+    first = stream.peek()
+    if first == "[":
+        yield from stream.array_items()
+        return
+    if first != "{":
+        stream.value()
+        return
+
+    best_rank, best = len(keys), None
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        rank = keys.index(key) if key in keys else len(keys)
+        if rank < best_rank and stream.peek() == "[":
+            if rank == 0:
+                yield from stream.array_items()
+                return
+            best_rank, best = rank, stream.value()
+        else:
+            stream.value()
+        char = stream.peek()
+        stream.pos += 1
+        if char == "}":
+            break
+        if char != ",":
+            raise ValueError(f"Malformed JSON object at offset {stream.pos}")
+    if best is not None:
+        yield from best
+
+
+def parse_txt(text: str) -> Iterable[str]:
+    return iter_txt([text])
+
+
+def parse_csv(text: str) -> Iterable[dict]:
+    return list(iter_csv([text]))
 
 
 def parse_json(text: str) -> Iterable[object]:
+    # The whole body is already in memory, so json.loads is the faster choice here.
     data = json.loads(text)
     if isinstance(data, list):
         return data
     if isinstance(data, dict):
-        for key in ("data", "items", "iocs"):
+        for key in JSON_RECORD_KEYS:
             if key in data and isinstance(data[key], list):
                 return data[key]
     return []
 
 
+def parse_feed_stream(
+    chunks: Iterable[bytes | str], feed_format: str, encoding: str | None = None
+) -> Iterator[object]:
+    """Parse a feed incrementally from an iterator of byte or text chunks.
+
+    Byte chunks are decoded with ``encoding`` (the charset the server declared),
+    or UTF-8 when it is unset or unknown.
+    """
+    fmt = feed_format.lower()
+    if fmt == "txt":
+        return iter_txt(chunks, encoding)
+    if fmt == "csv":
+        return iter_csv(chunks, encoding)
+    if fmt == "json":
+        return iter_json(chunks, encoding=encoding)
+    raise ValueError(f"Unsupported format: {feed_format}")
+
+
 def parse_feed(text: str, feed_format: str) -> Iterable[object]:
     fmt = feed_format.lower()
     if fmt == "txt":
@@ -0,0 +1,118 @@
+import cProfile
+import datetime as dt
+import os
+import re
+import threading
+import tracemalloc
+
+from aggregator.defaults import (
+    PROFILE_DIR as DEFAULT_PROFILE_DIR,
+    PROFILE_KEEP as DEFAULT_KEEP,
+    PROFILE_TOP as DEFAULT_TOP,
+)
+
+TRACE_FRAMES = 10
+
+_trace_lock = threading.Lock()
+_trace_users = 0
+
+
+def _start_tracing() -> None:
+    global _trace_users
+    with _trace_lock:
+        if _trace_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        _trace_users += 1
+
+
+def _stop_tracing() -> None:
+    global _trace_users
+    with _trace_lock:
+        _trace_users -= 1
+        if _trace_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def prune_profiles(profile_dir: str, keep: int) -> None:
+    """Delete all but the ``keep`` most recent profile runs in ``profile_dir``."""
+    runs: dict[str, list[str]] = {}
+    for entry in os.scandir(profile_dir):
+        if entry.is_file() and entry.name.endswith((".pstats", ".alloc.txt")):
+            run_id = entry.name.split(".", 1)[0]
+            runs.setdefault(run_id, []).append(entry.path)
+    # Run ids start with a UTC timestamp, so lexical order is chronological.
+    for run_id in sorted(runs)[: max(len(runs) - keep, 0)]:
+        for path in runs[run_id]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+class Profiler:
+    """Capture cProfile stats and tracemalloc allocation sites for one run.
+
+    Writes ``<run_id>.pstats`` (loadable with ``pstats`` and flamegraph tools
+    such as flameprof or snakeviz) and ``<run_id>.alloc.txt`` with the top
+    allocation sites and peak traced memory. cProfile only sees the thread
+    that started it; tracemalloc is process wide, so allocation sites from
+    concurrent runs can show up in each other's reports.
+    """
+
+    def __init__(
+        self,
+        profile_dir: str = DEFAULT_PROFILE_DIR,
+        label: str = "run",
+        top: int = DEFAULT_TOP,
+        keep: int = DEFAULT_KEEP,
+    ) -> None:
+        self.profile_dir = profile_dir
+        self.top = top
+        self.keep = keep
+        stamp = dt.datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+        safe_label = re.sub(r"[^A-Za-z0-9_-]+", "_", label).strip("_") or "run"
+        self.run_id = f"{stamp}-{os.getpid()}-{threading.get_ident()}-{safe_label}"
+        self._profile: cProfile.Profile | None = None
+
+    def start(self) -> "Profiler":
+        _start_tracing()
+        tracemalloc.reset_peak()
+        self._profile = cProfile.Profile()
+        self._profile.enable()
+        return self
+
+    def stop(self) -> str:
+        """Stop profiling, write the report files and return the pstats path."""
+        if self._profile is None:
+            return ""
+        self._profile.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        _stop_tracing()
+
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stats_path = os.path.join(self.profile_dir, f"{self.run_id}.pstats")
+        self._profile.dump_stats(stats_path)
+        self._profile = None
+
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+            )
+        )
+        lines = [f"run {self.run_id}", f"traced current={current} peak={peak} bytes", ""]
+        for index, stat in enumerate(snapshot.statistics("lineno")[: self.top], start=1):
+            frame = stat.traceback[0]
+            lines.append(f"#{index} {frame.filename}:{frame.lineno} size={stat.size} count={stat.count}")
+        with open(os.path.join(self.profile_dir, f"{self.run_id}.alloc.txt"), "w", encoding="utf-8") as handle:
+            handle.write("\n".join(lines) + "\n")
+
+        prune_profiles(self.profile_dir, self.keep)
+        return stats_path
+
+    def __enter__(self) -> "Profiler":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
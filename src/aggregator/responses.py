@@ -0,0 +1,104 @@
+import gzip
+import json
+
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional dependency
+    zstandard = None
+
+SHAPES = ("rows", "columnar")
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves.
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+ZSTD_LEVEL = 3
+
+
+def _compress_gzip(body: bytes) -> bytes:
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _compress_brotli(body: bytes) -> bytes:
+    return brotli.compress(body, quality=BROTLI_QUALITY)
+
+
+def _compress_zstd(body: bytes) -> bytes:
+    return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+
+
+# Server preference when the client accepts several encodings equally.
+ENCODERS = {"zstd": _compress_zstd, "br": _compress_brotli, "gzip": _compress_gzip}
+AVAILABLE_ENCODINGS = tuple(
+    name
+    for name, module in (("zstd", zstandard), ("br", brotli), ("gzip", gzip))
+    if module is not None
+)
+
+
+def dumps(obj: object) -> bytes:
+    """Serialize to compact UTF-8 JSON, with orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def shape_rows(columns: tuple[str, ...], rows: list[tuple], shape: str = "rows") -> list[dict] | dict[str, list]:
+    """Turn result tuples into a list of objects, or into one array per column for ``columnar``."""
+    if shape == "rows":
+        return [dict(zip(columns, row)) for row in rows]
+    if shape == "columnar":
+        if not rows:
+            return {column: [] for column in columns}
+        return dict(zip(columns, map(list, zip(*rows))))
+    raise ValueError(f"Unsupported shape: {shape}")
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick the best available content coding from an ``Accept-Encoding`` header (None for identity)."""
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        weight = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name] = weight
+    best = None
+    best_weight = 0.0
+    for name in AVAILABLE_ENCODINGS:
+        weight = weights.get(name, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = name, weight
+    return best
+
+
+def json_response(payload: object, status: int = 200) -> Response:
+    """JSON response compressed according to the request's ``Accept-Encoding``."""
+    body = dumps(payload)
+    response = Response(status=status, mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""))
+    if encoding and len(body) >= MIN_COMPRESS_BYTES:
+        body = ENCODERS[encoding](body)
+        response.headers["Content-Encoding"] = encoding
+    response.set_data(body)
+    return response
@@ -0,0 +1,302 @@
+import bisect
+import contextlib
+import gzip
+import ipaddress
+import mmap
+import os
+import re
+import socket
+from typing import Iterable, Iterator
+
+from aggregator.defaults import SCAN_CHUNK_BYTES as DEFAULT_CHUNK_BYTES
+from aggregator.normalizer import canonicalize
+from aggregator.store import iter_ioc_values
+
+BLOCK_BYTES = 4 * 1024 * 1024
+
+# One pass over the raw bytes finds every candidate; matches are decoded and
+# validated only after the regex has done the cheap filtering.
+EXTRACT_RE = re.compile(
+    rb"(?P<url>\b[a-zA-Z][a-zA-Z0-9+.-]{1,15}://[^\s\"'<>]+)"
+    rb"|(?P<ipv4>(?<![\d.])(?:\d{1,3}\.){3}\d{1,3}(?!\.?\d))"
+    rb"|(?P<ipv6>(?<![\w:.])[0-9a-fA-F]{0,4}:[0-9a-fA-F:]{2,38}(?![\w:]))"
+    rb"|(?P<domain>\b(?:[a-zA-Z0-9][a-zA-Z0-9-]{0,62}\.)+(?:[a-zA-Z]{2,63}|xn--[a-zA-Z0-9-]{1,59})\b(?![.-]?\w))"
+)
+_URL_TRAILING = ".,;:!?)]}'\""
+_URL_HOST_RE = re.compile(r"://(?:[^/?#@]*@)?(\[[^\]/]*\]|[^/?#:]*)")
+# Log lines repeat the same hosts and addresses, so match results are cached
+# per scanned range; the cache is simply cleared when it fills up.
+MATCH_CACHE_SIZE = 1 << 16
+
+
+_MISS = object()
+
+
+class IocMatcher:
+    """In-memory IOC lookup structures built once from the store.
+
+    Single addresses, domains and URLs are exact sets. Networks are sorted
+    into disjoint merged ranges per IP version and searched with ``bisect``;
+    each range keeps its member networks so a hit reports the most specific
+    one. Domain IOCs also match subdomains (``a.evil.com`` hits ``evil.com``).
+    Observed URLs are only canonicalized when their host has a URL IOC.
+    """
+
+    def __init__(self, values: Iterable[tuple[str, str]]) -> None:
+        self.addresses: set[str] = set()
+        self.domains: set[str] = set()
+        self.urls: set[str] = set()
+        self.url_hosts: set[str] = set()
+        networks: dict[int, list] = {4: [], 6: []}
+        for ioc_type, value in values:
+            if ioc_type == "ip":
+                if "/" in value:
+                    try:
+                        network = ipaddress.ip_network(value, strict=False)
+                    except ValueError:
+                        continue
+                    networks[network.version].append(network)
+                else:
+                    self.addresses.add(value)
+            elif ioc_type == "domain":
+                self.domains.add(value)
+            elif ioc_type == "url":
+                self.urls.add(value)
+                host = _URL_HOST_RE.search(value)
+                if host:
+                    self.url_hosts.add(host.group(1))
+        self.ranges = {version: self._merge(nets) for version, nets in networks.items()}
+
+    @staticmethod
+    def _merge(networks: list) -> tuple[list[int], list[int], list[list]]:
+        """Merge networks into sorted disjoint ranges, keeping ``(first, last, prefixlen, cidr)`` members."""
+        starts: list[int] = []
+        ends: list[int] = []
+        members: list[list] = []
+        for network in sorted(networks, key=lambda net: (int(net.network_address), -net.prefixlen)):
+            first = int(network.network_address)
+            last = int(network.broadcast_address)
+            member = (first, last, network.prefixlen, str(network))
+            if ends and first <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], last)
+                members[-1].append(member)
+            else:
+                starts.append(first)
+                ends.append(last)
+                members.append([member])
+        return starts, ends, members
+
+    def __len__(self) -> int:
+        networks = sum(len(group) for _, _, members in self.ranges.values() for group in members)
+        return len(self.addresses) + len(self.domains) + len(self.urls) + networks
+
+    def _match_range(self, version: int, number: int) -> tuple[str, str, str] | None:
+        starts, ends, members = self.ranges[version]
+        position = bisect.bisect_right(starts, number) - 1
+        if position < 0 or number > ends[position]:
+            return None
+        best = None
+        for first, last, prefixlen, cidr in members[position]:
+            if first <= number <= last and (best is None or prefixlen > best[0]):
+                best = (prefixlen, cidr)
+        return ("ip", best[1], "cidr") if best is not None else None
+
+    def match_ip(self, text: str) -> tuple[str, str, str] | None:
+        if ":" not in text:
+            # Dotted quads from the extractor are already canonical unless malformed.
+            if text in self.addresses:
+                return "ip", text, "exact"
+            if not self.ranges[4][0]:
+                return None
+            try:
+                packed = socket.inet_pton(socket.AF_INET, text)
+            except OSError:
+                return None
+            return self._match_range(4, int.from_bytes(packed, "big"))
+        try:
+            address = ipaddress.ip_address(canonicalize("ip", text))
+        except ValueError:
+            return None
+        value = str(address)
+        if value in self.addresses:
+            return "ip", value, "exact"
+        return self._match_range(address.version, int(address))
+
+    def match_domain(self, host: str) -> tuple[str, str, str] | None:
+        host = host.rstrip(".").lower()
+        if host in self.domains:
+            return "domain", host, "exact"
+        position = host.find(".")
+        while position != -1:
+            suffix = host[position + 1 :]
+            if "." not in suffix:
+                break
+            if suffix in self.domains:
+                return "domain", suffix, "suffix"
+            position = host.find(".", position + 1)
+        return None
+
+    def match_url(self, text: str) -> tuple[str, str, str] | None:
+        """Match a URL exactly, then fall back to its host."""
+        text = text.rstrip(_URL_TRAILING)
+        found = _URL_HOST_RE.search(text)
+        if not found:
+            return None
+        host = found.group(1).lower()
+        if host in self.url_hosts or host.startswith("["):
+            url = canonicalize("url", text)
+            if url in self.urls:
+                return "url", url, "exact"
+        if host.startswith("["):
+            return self.match_ip(host[1:-1])
+        if host[-1:].isdigit():
+            return self.match_ip(host)
+        return self.match_domain(host)
+
+    def match(self, kind: str, text: str) -> tuple[str, str, str] | None:
+        """Return ``(type, ioc, match)`` for an extracted candidate, or None."""
+        if kind == "url":
+            return self.match_url(text)
+        if kind == "domain":
+            return self.match_domain(text)
+        return self.match_ip(text)
+
+
+def load_matcher(db_path: str) -> IocMatcher:
+    return IocMatcher(iter_ioc_values(db_path))
+
+
+def split_file(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> list[tuple[str, int, int]]:
+    """Split a log file into ``(path, start, end)`` ranges that end on a newline.
+
+    Gzip files cannot be split and are returned as a single streamed range.
+    """
+    size = os.path.getsize(path)
+    if path.endswith(".gz") or size <= chunk_bytes:
+        return [(path, 0, size)]
+    ranges = []
+    with open(path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < size:
+            newline = data.find(b"\n", min(start + chunk_bytes, size) - 1)
+            end = size if newline == -1 else newline + 1
+            ranges.append((path, start, end))
+            start = end
+    return ranges
+
+
+def _scan_block(matcher: IocMatcher, path: str, block: bytes, base: int, hits: list[dict], cache: dict) -> None:
+    for found in EXTRACT_RE.finditer(block):
+        raw = found.group()
+        hit = cache.get(raw, _MISS)
+        if hit is _MISS:
+            kind = found.lastgroup
+            if kind == "ipv4" or kind == "ipv6":
+                kind = "ip"
+            hit = matcher.match(kind, raw.decode("utf-8", "replace"))
+            if len(cache) >= MATCH_CACHE_SIZE:
+                cache.clear()
+            cache[raw] = hit
+        if hit is not None:
+            ioc_type, ioc, how = hit
+            hits.append(
+                {
+                    "file": path,
+                    "offset": base + found.start(),
+                    "observed": raw.decode("utf-8", "replace"),
+                    "type": ioc_type,
+                    "ioc": ioc,
+                    "match": how,
+                }
+            )
+
+
+def _blocks(data, start: int, end: int, block_bytes: int) -> Iterator[tuple[int, bytes]]:
+    """Yield newline-aligned ``(offset, bytes)`` blocks of ``data[start:end]``."""
+    while start < end:
+        stop = min(start + block_bytes, end)
+        if stop < end:
+            newline = data.rfind(b"\n", start, stop)
+            stop = newline + 1 if newline != -1 else stop
+        yield start, data[start:stop]
+        start = stop
+
+
+def _gzip_blocks(path: str, block_bytes: int) -> Iterator[tuple[int, bytes]]:
+    offset = 0
+    pending = b""
+    with gzip.open(path, "rb") as handle:
+        while True:
+            chunk = handle.read(block_bytes)
+            if not chunk:
+                break
+            data = pending + chunk
+            cut = data.rfind(b"\n") + 1
+            if not cut:
+                pending = data
+                continue
+            yield offset, data[:cut]
+            offset += cut
+            pending = data[cut:]
+    if pending:
+        yield offset, pending
+
+
+def scan_range(
+    matcher: IocMatcher, path: str, start: int, end: int, block_bytes: int = BLOCK_BYTES
+) -> tuple[list[dict], int, int]:
+    """Scan one file range; returns ``(hits, lines, bytes)``.
+
+    Plain files are memory-mapped; offsets are byte offsets into the file
+    (into the decompressed stream for ``.gz`` files).
+    """
+    hits: list[dict] = []
+    cache: dict = {}
+    lines = 0
+    scanned = 0
+    with contextlib.ExitStack() as stack:
+        if path.endswith(".gz"):
+            blocks = _gzip_blocks(path, block_bytes)
+        elif end > start:
+            handle = stack.enter_context(open(path, "rb"))
+            data = stack.enter_context(mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ))
+            blocks = _blocks(data, start, end, block_bytes)
+        else:
+            blocks = iter(())
+        for base, block in blocks:
+            _scan_block(matcher, path, block, base, hits, cache)
+            lines += block.count(b"\n") + (0 if block.endswith(b"\n") else 1)
+            scanned += len(block)
+    return hits, lines, scanned
+
+
+_WORKER_MATCHER: IocMatcher | None = None
+
+
+def _init_worker(matcher: IocMatcher) -> None:
+    global _WORKER_MATCHER
+    _WORKER_MATCHER = matcher
+
+
+def _scan_task(task: tuple[str, int, int]) -> tuple[list[dict], int, int]:
+    return scan_range(_WORKER_MATCHER, *task)
+
+
+def scan_files(
+    matcher: IocMatcher,
+    paths: Iterable[str],
+    workers: int = 1,
+    chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> Iterator[tuple[list[dict], int, int]]:
+    """Scan files across ``workers`` processes, yielding per-range results in file order."""
+    tasks = [task for path in paths for task in split_file(path, chunk_bytes)]
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            yield scan_range(matcher, *task)
+        return
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(tasks)), initializer=_init_worker, initargs=(matcher,)
+    ) as executor:
+        yield from executor.map(_scan_task, tasks)
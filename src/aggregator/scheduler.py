@@ -0,0 +1,225 @@
+import datetime as dt
+import heapq
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from aggregator.defaults import SCHEDULE_MAX_BACKOFF as DEFAULT_MAX_BACKOFF
+
+RETRY_BASE = 60
+SCHEDULE_STATUS_FILE = "schedule_status.json"
+
+
+def _utc_iso(timestamp: float) -> str:
+    return dt.datetime.utcfromtimestamp(timestamp).replace(microsecond=0).isoformat() + "Z"
+
+
+def load_status(path: str) -> dict:
+    """Read the status file written by a running scheduler."""
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {"updated_at": None, "feeds": {}}
+
+
+class FeedScheduler:
+    """Run each feed on its own cadence with a global concurrency cap.
+
+    Feeds are kept in a priority queue keyed by their next due time. A feed's
+    ``interval`` (seconds), ``jitter`` (seconds of random delay added to each
+    run) and ``timeout`` are read from its ``feeds.json`` entry. Due times are
+    anchored to the previous due time rather than to completion, so ticks do
+    not drift by however long a fetch took. Failing feeds are retried with an
+    exponentially growing delay (starting at ``RETRY_BASE`` seconds, capped
+    at ``max_backoff``). ``on_idle`` is called each time the last in-flight
+    run finishes, i.e. once per pass rather than once per feed.
+    """
+
+    def __init__(
+        self,
+        feeds: list[dict],
+        run_feed: Callable[[dict], dict],
+        default_interval: int,
+        concurrency: int = 4,
+        iterations: int = 0,
+        max_backoff: int = DEFAULT_MAX_BACKOFF,
+        status_path: str = "",
+        logger: logging.Logger | None = None,
+        on_idle: Callable[[], None] | None = None,
+    ) -> None:
+        self.feeds = {feed["name"]: feed for feed in feeds}
+        self.run_feed = run_feed
+        self.default_interval = default_interval
+        self.concurrency = max(concurrency, 1)
+        self.iterations = iterations
+        self.max_backoff = max_backoff
+        self.status_path = status_path
+        self.logger = logger or logging.getLogger("aggregator")
+        self.on_idle = on_idle
+        self._queue: list[tuple[float, int, str]] = []
+        self._sequence = 0
+        self._base_due: dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._status: dict[str, dict] = {}
+
+        start = time.monotonic()
+        for name, feed in self.feeds.items():
+            self._status[name] = {
+                "interval": self.interval_for(feed),
+                "runs": 0,
+                "consecutive_failures": 0,
+                "running": False,
+                "last_run": None,
+                "last_duration": None,
+                "last_status": None,
+                "last_error": None,
+                "last_iocs": None,
+                "last_inserted": None,
+                "next_run": None,
+            }
+            self._base_due[name] = start
+            self._push(name, start + self._jitter(feed))
+
+    def interval_for(self, feed: dict) -> int:
+        return int(feed.get("interval") or self.default_interval)
+
+    def _jitter(self, feed: dict) -> float:
+        jitter = float(feed.get("jitter") or 0)
+        return random.uniform(0, jitter) if jitter > 0 else 0.0
+
+    def _push(self, name: str, due: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._queue, (due, self._sequence, name))
+        wall = time.time() + max(due - time.monotonic(), 0)
+        self._status[name]["next_run"] = _utc_iso(wall)
+
+    def status(self) -> dict:
+        with self._lock:
+            feeds = {name: dict(state) for name, state in self._status.items()}
+        return {"updated_at": _utc_iso(time.time()), "feeds": feeds}
+
+    def _write_status(self) -> None:
+        if not self.status_path:
+            return
+        directory = os.path.dirname(self.status_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = self.status_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            json.dump(self.status(), handle, indent=2)
+        os.replace(temp_path, self.status_path)
+
+    def _reschedule(self, name: str, succeeded: bool) -> None:
+        feed = self.feeds[name]
+        state = self._status[name]
+        interval = self.interval_for(feed)
+        now = time.monotonic()
+
+        if self.iterations and state["runs"] >= self.iterations:
+            state["next_run"] = None
+            return
+
+        if succeeded:
+            base_due = self._base_due[name] + interval
+            if base_due < now:
+                base_due = now
+        else:
+            failures = state["consecutive_failures"]
+            delay = min(RETRY_BASE * 2 ** (failures - 1), self.max_backoff)
+            base_due = now + delay
+        self._base_due[name] = base_due
+        self._push(name, base_due + self._jitter(feed))
+
+    def _start(self, executor: ThreadPoolExecutor, name: str) -> Future:
+        with self._lock:
+            self._status[name]["running"] = True
+        self.logger.info("schedule dispatch feed=%s", name)
+        return executor.submit(self._timed_run, name)
+
+    def _timed_run(self, name: str) -> tuple[float, float, dict | None, Exception | None]:
+        started_wall = time.time()
+        started = time.perf_counter()
+        try:
+            result = self.run_feed(self.feeds[name])
+            error = None
+        except Exception as exc:
+            result = None
+            error = exc
+        return started_wall, time.perf_counter() - started, result, error
+
+    def _finish(self, name: str, future: Future) -> None:
+        started_wall, duration, result, error = future.result()
+        with self._lock:
+            state = self._status[name]
+            state["running"] = False
+            state["runs"] += 1
+            state["last_run"] = _utc_iso(started_wall)
+            state["last_duration"] = round(duration, 3)
+            if error is None:
+                state["last_status"] = "ok"
+                state["last_error"] = None
+                state["consecutive_failures"] = 0
+                state["last_iocs"] = (result or {}).get("iocs")
+                state["last_inserted"] = (result or {}).get("inserted")
+            else:
+                state["last_status"] = "error"
+                state["last_error"] = str(error)
+                state["consecutive_failures"] += 1
+            self._reschedule(name, succeeded=error is None)
+
+        if error is None:
+            self.logger.info("schedule done feed=%s duration=%.3f", name, duration)
+        else:
+            self.logger.warning(
+                "schedule failed feed=%s failures=%d next_run=%s error=%s",
+                name,
+                state["consecutive_failures"],
+                state["next_run"],
+                error,
+            )
+
+    def _idle(self) -> None:
+        if self.on_idle is None:
+            return
+        try:
+            self.on_idle()
+        except Exception as exc:
+            self.logger.warning("schedule idle hook failed error=%s", exc)
+
+    def run(self) -> None:
+        running: dict[Future, str] = {}
+        self._write_status()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while self._queue or running:
+                now = time.monotonic()
+                dispatched = False
+                while self._queue and self._queue[0][0] <= now and len(running) < self.concurrency:
+                    _, _, name = heapq.heappop(self._queue)
+                    running[self._start(executor, name)] = name
+                    dispatched = True
+                if dispatched:
+                    self._write_status()
+
+                timeout = None
+                if self._queue and len(running) < self.concurrency:
+                    timeout = max(self._queue[0][0] - time.monotonic(), 0)
+
+                if not running:
+                    if timeout is None:
+                        break
+                    time.sleep(timeout)
+                    continue
+
+                done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    self._finish(running.pop(future), future)
+                if done:
+                    self._write_status()
+                    if not running:
+                        self._idle()
@@ -0,0 +1,296 @@
+import bisect
+import ipaddress
+import json
+import mmap
+import os
+import shutil
+import socket
+import struct
+import tempfile
+import time
+import zlib
+from array import array
+
+from aggregator.normalizer import canonicalize, detect_type
+from aggregator.store import iter_ioc_records
+
+SNAPSHOT_FILE = "iocs.snapshot"
+SNAPSHOT_MAGIC = b"TFASNAP\x00"
+SNAPSHOT_VERSION = 1
+# Arrays are written in native byte order; the marker lets readers reject a
+# snapshot copied from a machine with the other endianness.
+BYTE_ORDER_MARK = 0x01020304
+HEADER = struct.Struct("=8sIIIIIQQ")
+HEADER_SIZE = 64
+_ALIGN = 8
+
+
+def _hash(raw: bytes) -> int:
+    # Two cheap checksums make a 64-bit key; equal keys are verified against the pool.
+    return (zlib.crc32(raw) << 32) | zlib.adler32(raw)
+
+
+def _pad(length: int) -> int:
+    return -length % _ALIGN
+
+
+def _encode_record(ioc_type: str, value: str, sources: list[tuple[str, str, str]]) -> bytes:
+    """Pool entry: the value, a NUL, then the type and sources as JSON (decoded only on demand)."""
+    details = {
+        "type": ioc_type,
+        "sources": [{"source": s, "severity": sev, "date_added": d} for s, sev, d in sources],
+    }
+    return value.encode("utf-8") + b"\0" + json.dumps(details, separators=(",", ":")).encode("utf-8")
+
+
+def _range_parents(ranges: list[tuple[int, int, int]]) -> array:
+    """Index of the innermost enclosing range for each sorted ``(first, last, _)`` range, or -1."""
+    parents = array("i")
+    stack: list[int] = []
+    for index, (first, last, _) in enumerate(ranges):
+        while stack and ranges[stack[-1]][1] < first:
+            stack.pop()
+        parents.append(stack[-1] if stack else -1)
+        stack.append(index)
+    return parents
+
+
+def write_snapshot(db_path: str, path: str) -> dict:
+    """Write an immutable lookup snapshot of the store to ``path`` (atomically replaced).
+
+    Layout after a 64 byte header: sorted 8-byte value hashes with the
+    offset/length of each record in the string pool; IPv4 and IPv6 CIDR
+    ranges as sorted columnar arrays (start, end, enclosing range, value
+    index); then the string pool, where each record is the value, a NUL and
+    its type and sources as JSON.
+    """
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    entries: list[tuple[int, int, int]] = []
+    networks: dict[int, list[tuple[int, int, int]]] = {4: [], 6: []}
+
+    with tempfile.TemporaryFile(dir=directory) as pool:
+        offset = 0
+        for ioc_type, value, sources in iter_ioc_records(db_path):
+            data = _encode_record(ioc_type, value, sources)
+            pool.write(data)
+            entries.append((_hash(value.encode("utf-8")), offset, len(data)))
+            if ioc_type == "ip" and "/" in value:
+                try:
+                    network = ipaddress.ip_network(value, strict=False)
+                except ValueError:
+                    pass
+                else:
+                    first = int(network.network_address)
+                    networks[network.version].append((first, int(network.broadcast_address), offset))
+            offset += len(data)
+        pool_size = offset
+
+        entries.sort()
+        index_of = {record_offset: index for index, (_, record_offset, _) in enumerate(entries)}
+        hashes = array("Q", (entry[0] for entry in entries))
+        offsets = array("Q", (entry[1] for entry in entries))
+        lengths = array("I", (entry[2] for entry in entries))
+
+        # Wider networks sort before the narrower ones they enclose.
+        v4 = sorted(networks[4], key=lambda item: (item[0], -item[1]))
+        v6 = sorted(networks[6], key=lambda item: (item[0], -item[1]))
+        mask = (1 << 64) - 1
+        sections = [
+            hashes,
+            offsets,
+            lengths,
+            array("I", (item[0] for item in v4)),
+            array("I", (item[1] for item in v4)),
+            _range_parents(v4),
+            array("I", (index_of[item[2]] for item in v4)),
+            array("Q", (item[0] >> 64 for item in v6)),
+            array("Q", (item[0] & mask for item in v6)),
+            array("Q", (item[1] >> 64 for item in v6)),
+            array("Q", (item[1] & mask for item in v6)),
+            _range_parents(v6),
+            array("I", (index_of[item[2]] for item in v6)),
+        ]
+
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                header = HEADER.pack(
+                    SNAPSHOT_MAGIC,
+                    SNAPSHOT_VERSION,
+                    BYTE_ORDER_MARK,
+                    len(entries),
+                    len(v4),
+                    len(v6),
+                    pool_size,
+                    int(time.time()),
+                )
+                handle.write(header.ljust(HEADER_SIZE, b"\0"))
+                for section in sections:
+                    raw = section.tobytes()
+                    handle.write(raw + b"\0" * _pad(len(raw)))
+                pool.seek(0)
+                shutil.copyfileobj(pool, handle)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+    return {"values": len(entries), "ipv4_ranges": len(v4), "ipv6_ranges": len(v6), "bytes": os.path.getsize(path)}
+
+
+class _U128:
+    """Read-only sequence of 128-bit integers split across high/low u64 arrays (for ``bisect``)."""
+
+    def __init__(self, high: memoryview, low: memoryview) -> None:
+        self.high = high
+        self.low = low
+
+    def __len__(self) -> int:
+        return len(self.high)
+
+    def __getitem__(self, index: int) -> int:
+        return (self.high[index] << 64) | self.low[index]
+
+
+class Snapshot:
+    """Memory-mapped, read-only view of a snapshot written by ``write_snapshot``.
+
+    Opening only maps the file and slices typed views over it, so every
+    worker process shares the same page cache and nothing is copied.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as handle:
+            self._mmap = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, mark, values, v4, v6, pool_size, built_at = HEADER.unpack_from(view)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or mark != BYTE_ORDER_MARK:
+            raise ValueError(f"Not a compatible IOC snapshot: {path}")
+        self.path = path
+        self.built_at = built_at
+        self.counts = {"values": values, "ipv4_ranges": v4, "ipv6_ranges": v6}
+
+        position = HEADER_SIZE
+
+        def take(fmt: str, count: int) -> memoryview:
+            nonlocal position
+            size = struct.calcsize(fmt) * count
+            section = view[position : position + size].cast(fmt)
+            position += size + _pad(size)
+            return section
+
+        self._hashes = take("Q", values)
+        self._offsets = take("Q", values)
+        self._lengths = take("I", values)
+        self._v4_starts = take("I", v4)
+        self._v4_ends = take("I", v4)
+        self._v4_parents = take("i", v4)
+        self._v4_records = take("I", v4)
+        starts_high, starts_low = take("Q", v6), take("Q", v6)
+        ends_high, ends_low = take("Q", v6), take("Q", v6)
+        self._v6_starts = _U128(starts_high, starts_low)
+        self._v6_ends = _U128(ends_high, ends_low)
+        self._v6_parents = take("i", v6)
+        self._v6_records = take("I", v6)
+        self._pool = view[position : position + pool_size]
+
+    def _find(self, value: str) -> list[int]:
+        raw = value.encode("utf-8")
+        key = _hash(raw)
+        hashes, offsets, pool = self._hashes, self._offsets, self._pool
+        index = bisect.bisect_left(hashes, key)
+        found = []
+        while index < len(hashes) and hashes[index] == key:
+            start = offsets[index]
+            end = start + len(raw)
+            if pool[start:end] == raw and pool[end] == 0:
+                found.append(index)
+            index += 1
+        return found
+
+    def _containing(self, version: int, number: int) -> list[int]:
+        """Value indices of every CIDR containing ``number``, innermost first."""
+        if version == 4:
+            starts, ends, parents, records = self._v4_starts, self._v4_ends, self._v4_parents, self._v4_records
+        else:
+            starts, ends, parents, records = self._v6_starts, self._v6_ends, self._v6_parents, self._v6_records
+        found = []
+        index = bisect.bisect_right(starts, number) - 1
+        while index >= 0:
+            if ends[index] >= number:
+                found.append(records[index])
+            index = parents[index]
+        return found
+
+    def match(self, value: str) -> list[tuple[str, int]]:
+        """``("exact" | "cidr", index)`` pairs for ``value``; pass the index to ``record``."""
+        value = value.strip()
+        address = _parse_address(value)
+        if address is not None:
+            text, version, number = address
+            exact = [("exact", index) for index in self._find(text)]
+            return exact + [("cidr", index) for index in self._containing(version, number)]
+        found = self._find(value)
+        if not found:
+            canonical = _canonical(value)
+            if canonical != value:
+                found = self._find(canonical)
+        return [("exact", index) for index in found]
+
+    def record(self, index: int) -> dict:
+        start = self._offsets[index]
+        raw = bytes(self._pool[start : start + self._lengths[index]])
+        value, _, details = raw.partition(b"\0")
+        record = json.loads(details)
+        return {"type": record["type"], "value": value.decode("utf-8"), "sources": record["sources"]}
+
+    def lookup(self, value: str) -> list[dict]:
+        """Exact matches for ``value`` (canonicalized if needed), then enclosing CIDRs for addresses."""
+        return [{**self.record(index), "match": how} for how, index in self.match(value)]
+
+
+def _parse_address(value: str) -> tuple[str, int, int] | None:
+    """``(canonical text, version, integer)`` if ``value`` is a single IP address."""
+    try:
+        # inet_pton rejects leading zeros, so accepted dotted quads are already canonical.
+        return value, 4, int.from_bytes(socket.inet_pton(socket.AF_INET, value), "big")
+    except OSError:
+        pass
+    if ":" not in value or "/" in value:
+        return None
+    try:
+        address = ipaddress.ip_address(value)
+    except ValueError:
+        return None
+    if address.version == 6 and address.ipv4_mapped:
+        address = address.ipv4_mapped
+    return str(address), address.version, int(address)
+
+
+def _canonical(value: str) -> str:
+    if value.isascii() and "/" not in value:
+        # Hostname-shaped values only need the domain rules.
+        return value.rstrip(".").lower()
+    return canonicalize(detect_type(value), value)
+
+
+class SnapshotReader:
+    """Hands out the current ``Snapshot``, remapping when the file is replaced."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._snapshot: Snapshot | None = None
+        self._identity: tuple | None = None
+
+    def get(self) -> Snapshot | None:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity != self._identity:
+            # The old mapping is left to the garbage collector; in-flight lookups keep it alive.
+            self._snapshot = Snapshot(self.path)
+            self._identity = identity
+        return self._snapshot
@@ -1,9 +1,21 @@
+import atexit
+import functools
+import heapq
+import itertools
 import json
+import operator
 import os
 import re
 import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
 from ipaddress import ip_address, ip_network, AddressValueError
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
+
+from aggregator.normalizer import IOC
+from aggregator.metrics import SEARCH_QUERY_SECONDS, SEARCH_ROWS_SCANNED
 
 
 def _ip_in_cidr(ip_str: str, cidr_str: str) -> bool:
@@ -24,7 +36,226 @@ def _matches_regex(value: str, pattern: str) -> bool:
         return False
 
 
+SEVERITY_RANK = {"low": 1, "medium": 2, "high": 3, "critical": 4}
+SORT_ORDERS = {
+    "date": "ioc_sources.date_added DESC",
+    "score": "iocs.score DESC, iocs.id DESC",
+}
+# Fields of each search result, in the order search_rows returns them.
+SEARCH_COLUMNS = ("type", "value", "source", "severity", "date_added", "source_count", "score")
+# Sort key of each SORT_ORDERS entry over those rows, used to merge shard results.
+MERGE_KEYS = {
+    "date": operator.itemgetter(SEARCH_COLUMNS.index("date_added")),
+    "score": operator.itemgetter(SEARCH_COLUMNS.index("score")),
+}
+# Per-IOC summary columns maintained by upsert_iocs (added to older databases by init_db).
+SUMMARY_COLUMNS = (
+    ("source_count", "INTEGER NOT NULL DEFAULT 0"),
+    ("max_severity", "TEXT"),
+    ("first_seen", "TEXT"),
+    ("last_seen", "TEXT"),
+    ("score", "INTEGER NOT NULL DEFAULT 0"),
+)
+
+
+def severity_rank(severity: str | None) -> int:
+    return SEVERITY_RANK.get(str(severity or "").lower(), 0)
+
+
+def ioc_score(source_count: int, max_severity: str | None) -> int:
+    """Confidence score: independent sources weighted by the most severe report (unknown counts as 1)."""
+    return source_count * max(severity_rank(max_severity), 1)
+
+
+def _backfill_summaries(conn: sqlite3.Connection) -> None:
+    """Compute the summary columns of every IOC from its source records."""
+
+    def summaries():
+        current = None
+        for ioc_id, severity, date_added in conn.execute(
+            "SELECT ioc_id, severity, date_added FROM ioc_sources ORDER BY ioc_id"
+        ):
+            if current is None or current[0] != ioc_id:
+                if current is not None:
+                    yield current
+                current = [ioc_id, 0, None, date_added, date_added]
+            current[1] += 1
+            if severity_rank(severity) > severity_rank(current[2]) or current[2] is None:
+                current[2] = severity
+            current[3] = min(current[3], date_added)
+            current[4] = max(current[4], date_added)
+        if current is not None:
+            yield current
+
+    updates = [
+        (count, severity, first_seen, last_seen, ioc_score(count, severity), ioc_id)
+        for ioc_id, count, severity, first_seen, last_seen in summaries()
+    ]
+    conn.executemany(
+        "UPDATE iocs SET source_count = ?, max_severity = ?, first_seen = ?, last_seen = ?, score = ? WHERE id = ?",
+        updates,
+    )
+
+
+def _suggest_terms(ioc_type: str, value: str) -> set[str]:
+    """Prefix-index terms for an IOC: its value, plus host and label suffixes for names.
+
+    ``login.evil.com`` is also indexed as ``evil.com`` so typing a registered
+    domain finds its subdomains; URLs are also indexed by host and without
+    their scheme. IP values already sort by octet, so the value covers them.
+    """
+    term = value.lower()
+    terms = {term}
+    host = ""
+    if ioc_type == "domain":
+        host = term
+    elif ioc_type == "url":
+        rest = term.partition("://")[2]
+        if rest:
+            terms.add(rest)
+            host = rest.split("/", 1)[0].rpartition("@")[2].split(":", 1)[0]
+            if host:
+                terms.add(host)
+    labels = host.split(".") if host and not host[-1:].isdigit() else []
+    for index in range(1, len(labels) - 1):
+        terms.add(".".join(labels[index:]))
+    return terms
+
+
+def _backfill_suggest_terms(conn: sqlite3.Connection) -> None:
+    rows = conn.execute("SELECT id, type, value FROM iocs").fetchall()
+    conn.executemany(
+        "INSERT OR IGNORE INTO suggest_terms (term, ioc_id) VALUES (?, ?)",
+        ((term, ioc_id) for ioc_id, ioc_type, value in rows for term in _suggest_terms(ioc_type, value)),
+    )
+
+
+SHARD_MANIFEST = "shards.json"
+SHARD_PARTITIONS = ("hash", "type")
+# Type-partitioned stores get one shard per type, plus one for everything else.
+TYPE_SHARDS = ("ip", "domain", "url")
+SHARD_WORKERS = int(os.environ.get("AGGREGATOR_SHARD_WORKERS", "0")) or os.cpu_count() or 1
+
+_shard_executor = None
+_shard_executor_lock = threading.Lock()
+
+
+def create_sharded_store(path: str, shards: int = 4, partition: str = "hash") -> dict:
+    """Create an empty sharded store: a directory of SQLite files described by ``shards.json``.
+
+    ``hash`` spreads IOCs over ``shards`` files by a CRC32 of the value;
+    ``type`` keeps one file per IOC type, so type-filtered queries read a
+    single shard. Every store function accepts the directory in place of a
+    database path.
+    """
+    if partition not in SHARD_PARTITIONS:
+        raise ValueError(f"Unsupported partition: {partition}")
+    if partition == "hash" and shards < 1:
+        raise ValueError("A hash-partitioned store needs at least one shard")
+    if is_sharded(path):
+        raise ValueError(f"Sharded store already exists: {path}")
+    if partition == "type":
+        names = [f"{ioc_type}.db" for ioc_type in TYPE_SHARDS] + ["other.db"]
+    else:
+        names = [f"shard-{index:03d}.db" for index in range(shards)]
+    manifest = {"version": 1, "partition": partition, "types": list(TYPE_SHARDS), "shards": names}
+    os.makedirs(path, exist_ok=True)
+    for name in names:
+        init_db(os.path.join(path, name))
+    temp_path = os.path.join(path, SHARD_MANIFEST + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(temp_path, os.path.join(path, SHARD_MANIFEST))
+    return manifest
+
+
+def is_sharded(path: str) -> bool:
+    return os.path.isfile(os.path.join(path, SHARD_MANIFEST))
+
+
+@functools.lru_cache(maxsize=16)
+def _read_manifest(manifest_path: str, mtime_ns: int) -> dict:
+    with open(manifest_path, "r", encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def _manifest(path: str) -> dict:
+    manifest_path = os.path.join(path, SHARD_MANIFEST)
+    return _read_manifest(manifest_path, os.stat(manifest_path).st_mtime_ns)
+
+
+def shard_paths(path: str) -> list[str]:
+    """Database files behind ``path``: the shards of a sharded store, or ``[path]``."""
+    if not is_sharded(path):
+        return [path]
+    return [os.path.join(path, name) for name in _manifest(path)["shards"]]
+
+
+def _shard_index(manifest: dict, ioc_type: str, value: str) -> int:
+    if manifest["partition"] == "type":
+        # Type filters match case-insensitively, so route writes and reads on the lowercased type.
+        ioc_type = str(ioc_type).lower()
+        types = manifest["types"]
+        return types.index(ioc_type) if ioc_type in types else len(types)
+    return zlib.crc32(value.encode("utf-8")) % len(manifest["shards"])
+
+
+def _query_shards(path: str, ioc_type: str = "") -> list[str]:
+    """Shards that can hold rows matching ``ioc_type`` (all of them unless partitioned by type)."""
+    manifest = _manifest(path)
+    if ioc_type and manifest["partition"] == "type":
+        index = _shard_index(manifest, ioc_type, "")
+        return [os.path.join(path, manifest["shards"][index])]
+    return [os.path.join(path, name) for name in manifest["shards"]]
+
+
+def _get_shard_executor():
+    """Create the shared shard pool once, even when several threads search at the same time.
+
+    Workers are spawned rather than forked: the dashboard and the scheduler
+    call in from worker threads, and forking a multithreaded process can copy
+    locks that are held by another thread.
+    """
+    global _shard_executor
+    with _shard_executor_lock:
+        if _shard_executor is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+
+            _shard_executor = ProcessPoolExecutor(
+                max_workers=SHARD_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+            atexit.register(_shutdown_shard_executor)
+        return _shard_executor
+
+
+def _shutdown_shard_executor() -> None:
+    """Stop the shared shard pool, if one was started (the next fan-out starts a new one)."""
+    global _shard_executor
+    with _shard_executor_lock:
+        executor, _shard_executor = _shard_executor, None
+    if executor is not None:
+        atexit.unregister(_shutdown_shard_executor)
+        executor.shutdown()
+
+
+def _fan_out(func: Callable, paths: list[str], *iterables: Iterable) -> list:
+    """``func(path, ...)`` for every shard, across a shared process pool when that can help."""
+    if len(paths) <= 1 or SHARD_WORKERS <= 1:
+        return list(map(func, paths, *iterables))
+    return list(_get_shard_executor().map(func, paths, *iterables))
+
+
+def last_modified(path: str) -> int:
+    """Latest modification time (ns) of the store's database files, for cache invalidation."""
+    return max(os.stat(shard).st_mtime_ns for shard in shard_paths(path))
+
+
 def init_db(path: str) -> None:
+    if is_sharded(path):
+        for shard in shard_paths(path):
+            init_db(shard)
+        return
     os.makedirs(os.path.dirname(path), exist_ok=True)
     with sqlite3.connect(path) as conn:
         conn.execute(
@@ -34,6 +265,11 @@ def init_db(path: str) -> None:
                 type TEXT NOT NULL,
                 value TEXT NOT NULL,
                 created_at TEXT NOT NULL,
+                source_count INTEGER NOT NULL DEFAULT 0,
+                max_severity TEXT,
+                first_seen TEXT,
+                last_seen TEXT,
+                score INTEGER NOT NULL DEFAULT 0,
                 UNIQUE(type, value)
             )
             """
@@ -51,79 +287,128 @@ def init_db(path: str) -> None:
             )
             """
         )
+        has_suggest_terms = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'suggest_terms'"
+        ).fetchone()
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS suggest_terms (
+                term TEXT NOT NULL,
+                ioc_id INTEGER NOT NULL,
+                PRIMARY KEY(term, ioc_id)
+            ) WITHOUT ROWID
+            """
+        )
+        if not has_suggest_terms:
+            _backfill_suggest_terms(conn)
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(iocs)")}
+        missing = [(name, ddl) for name, ddl in SUMMARY_COLUMNS if name not in columns]
+        for name, ddl in missing:
+            conn.execute(f"ALTER TABLE iocs ADD COLUMN {name} {ddl}")
+        if missing:
+            _backfill_summaries(conn)
         conn.execute("CREATE INDEX IF NOT EXISTS idx_iocs_type ON iocs(type)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_iocs_value ON iocs(value)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_iocs_score ON iocs(score)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_iocs_type_score ON iocs(LOWER(type), score)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_sources_source ON ioc_sources(source)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_sources_severity ON ioc_sources(severity)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_sources_date ON ioc_sources(date_added)")
 
 
-def upsert_iocs(path: str, iocs: Iterable[dict]) -> int:
+def upsert_iocs(path: str, iocs: Iterable[IOC]) -> int:
+    """Insert normalized IOCs and their source records, returning new source records.
+
+    The per-IOC summary columns are updated in place: a new source bumps
+    ``source_count`` and may raise ``max_severity``/``score``; any sighting
+    advances ``last_seen``. For a sharded store the batch is split by shard
+    and the shards are written in parallel.
+    """
+    if is_sharded(path):
+        manifest = _manifest(path)
+        batches: list[list[IOC]] = [[] for _ in manifest["shards"]]
+        for ioc in iocs:
+            batches[_shard_index(manifest, ioc[0], ioc[1])].append(ioc)
+        targets = [(os.path.join(path, name), batch) for name, batch in zip(manifest["shards"], batches) if batch]
+        return sum(_fan_out(upsert_iocs, [shard for shard, _ in targets], [batch for _, batch in targets]))
     init_db(path)
     inserted = 0
+    terms: list[tuple[str, int]] = []
     with sqlite3.connect(path) as conn:
         conn.execute("PRAGMA foreign_keys = ON")
         cursor = conn.cursor()
-        for ioc in iocs:
+        for ioc_type, value, source, severity, date_added in iocs:
+            # A new IOC gets its summary straight away: this source is its only one.
             cursor.execute(
-                "INSERT OR IGNORE INTO iocs (type, value, created_at) VALUES (?, ?, ?)",
-                (ioc["type"], ioc["value"], ioc["date_added"]),
+                """
+                INSERT OR IGNORE INTO iocs
+                    (type, value, created_at, source_count, max_severity, first_seen, last_seen, score)
+                VALUES (?, ?, ?, 1, ?, ?, ?, ?)
+                """,
+                (ioc_type, value, date_added, severity, date_added, date_added, ioc_score(1, severity)),
             )
+            if cursor.rowcount:
+                ioc_id = cursor.lastrowid
+                cursor.execute(
+                    "INSERT INTO ioc_sources (ioc_id, source, severity, date_added) VALUES (?, ?, ?, ?)",
+                    (ioc_id, source, severity, date_added),
+                )
+                terms.extend((term, ioc_id) for term in _suggest_terms(ioc_type, value))
+                inserted += 1
+                continue
+
             cursor.execute(
-                "SELECT id FROM iocs WHERE type = ? AND value = ?",
-                (ioc["type"], ioc["value"]),
+                "SELECT id, source_count, max_severity, first_seen, last_seen FROM iocs WHERE type = ? AND value = ?",
+                (ioc_type, value),
             )
             row = cursor.fetchone()
             if not row:
                 continue
-            ioc_id = row[0]
+            ioc_id, source_count, max_severity, first_seen, last_seen = row
             cursor.execute(
                 """
                 INSERT OR IGNORE INTO ioc_sources (ioc_id, source, severity, date_added)
                 VALUES (?, ?, ?, ?)
                 """,
-                (ioc_id, ioc["source"], ioc["severity"], ioc["date_added"]),
+                (ioc_id, source, severity, date_added),
             )
             if cursor.rowcount:
                 inserted += 1
+                source_count += 1
+                if max_severity is None or severity_rank(severity) > severity_rank(max_severity):
+                    max_severity = severity
+                first_seen = min(first_seen or date_added, date_added)
+                last_seen = max(last_seen or date_added, date_added)
+                cursor.execute(
+                    """
+                    UPDATE iocs SET source_count = ?, max_severity = ?, first_seen = ?, last_seen = ?, score = ?
+                    WHERE id = ?
+                    """,
+                    (source_count, max_severity, first_seen, last_seen, ioc_score(source_count, max_severity), ioc_id),
+                )
+            elif last_seen is None or date_added > last_seen:
+                # Only an unindexed column changes, so re-sightings do not touch the score indexes.
+                cursor.execute("UPDATE iocs SET last_seen = ? WHERE id = ?", (date_added, ioc_id))
+        # Terms of new IOCs go into the prefix index in key order, which keeps B-tree inserts sequential.
+        terms.sort()
+        cursor.executemany("INSERT OR IGNORE INTO suggest_terms (term, ioc_id) VALUES (?, ?)", terms)
         conn.commit()
     return inserted
 
 
-def search_iocs(
-    path: str,
-    query: str = "",
+def _search_filters(
     ioc_type: str = "",
     source: str = "",
     severity: str = "",
-    search_mode: str = "simple",
     date_from: str = "",
     date_to: str = "",
-    limit: int | None = None,
-    offset: int = 0,
-) -> list[dict]:
-    """Search IOCs with optional advanced filters.
-    
-    Args:
-        path: Database path
-        query: Search query string
-        ioc_type: Filter by IOC type
-        source: Filter by source
-        severity: Filter by severity
-        search_mode: "simple" (LIKE), "regex", or "cidr"
-        date_from: ISO date string (YYYY-MM-DD)
-        date_to: ISO date string (YYYY-MM-DD)
-        limit: Result limit
-        offset: Result offset
-    """
-    init_db(path)
-    sql = (
-        "SELECT iocs.type, iocs.value, ioc_sources.source, ioc_sources.severity, ioc_sources.date_added "
-        "FROM iocs JOIN ioc_sources ON ioc_sources.ioc_id = iocs.id"
-    )
+    min_sources: int = 0,
+) -> tuple[str, list[object]]:
+    """Build the shared FROM/WHERE clause of search_iocs and count_iocs."""
+    sql = " FROM iocs JOIN ioc_sources ON ioc_sources.ioc_id = iocs.id"
     clauses = []
     params: list[object] = []
-    
+
     if ioc_type:
         clauses.append("LOWER(iocs.type) = ?")
         params.append(ioc_type.lower())
@@ -139,41 +424,171 @@ def search_iocs(
     if date_to:
         clauses.append("DATE(ioc_sources.date_added) <= ?")
         params.append(date_to)
-    
+    if min_sources > 1:
+        clauses.append("iocs.source_count >= ?")
+        params.append(min_sources)
+
     if clauses:
         sql += " WHERE " + " AND ".join(clauses)
-    sql += " ORDER BY ioc_sources.date_added DESC"
+    return sql, params
+
+
+def _select_rows(
+    path: str,
+    query: str = "",
+    ioc_type: str = "",
+    source: str = "",
+    severity: str = "",
+    search_mode: str = "simple",
+    date_from: str = "",
+    date_to: str = "",
+    limit: int | None = None,
+    offset: int = 0,
+    sort: str = "date",
+    min_sources: int = 0,
+) -> tuple[list[tuple], int, float]:
+    """Run a search against one database file; returns ``(rows, rows scanned, SQL seconds)``."""
+    init_db(path)
+    filters, params = _search_filters(ioc_type, source, severity, date_from, date_to, min_sources)
+    sql = (
+        "SELECT iocs.type, iocs.value, ioc_sources.source, ioc_sources.severity, ioc_sources.date_added, "
+        "iocs.source_count, iocs.score" + filters + " ORDER BY " + SORT_ORDERS[sort]
+    )
+    # Without a value query every filter runs in SQL, so the page can be cut there too.
+    paged_in_sql = not query and (limit is not None or offset)
+    if paged_in_sql:
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit if limit is not None else -1, offset]
     
+    started = time.perf_counter()
     with sqlite3.connect(path) as conn:
         rows = conn.execute(sql, params).fetchall()
-    
-    results = [
-        {
-            "type": row[0],
-            "value": row[1],
-            "source": row[2],
-            "severity": row[3],
-            "date_added": row[4],
-        }
-        for row in rows
-    ]
+    seconds = time.perf_counter() - started
+    scanned = len(rows)
     
     # Apply advanced filtering in-memory (cannot be done in SQL easily)
     if query:
         if search_mode == "regex":
-            results = [r for r in results if _matches_regex(r["value"], query)]
+            rows = [r for r in rows if _matches_regex(r[1], query)]
         elif search_mode == "cidr":
-            results = [r for r in results if r["type"] == "ip" and _ip_in_cidr(r["value"], query)]
+            rows = [r for r in rows if r[0] == "ip" and _ip_in_cidr(r[1], query)]
         else:  # "simple" (default)
-            results = [r for r in results if query.lower() in r["value"].lower()]
+            needle = query.lower()
+            rows = [r for r in rows if needle in r[1].lower()]
     
     # Apply limit and offset after filtering
+    if paged_in_sql:
+        return rows, scanned, seconds
     if limit is not None:
-        results = results[offset : offset + limit]
+        rows = rows[offset : offset + limit]
     elif offset:
-        results = results[offset:]
+        rows = rows[offset:]
     
-    return results
+    return rows, scanned, seconds
+
+
+def search_rows(
+    path: str,
+    query: str = "",
+    ioc_type: str = "",
+    source: str = "",
+    severity: str = "",
+    search_mode: str = "simple",
+    date_from: str = "",
+    date_to: str = "",
+    limit: int | None = None,
+    offset: int = 0,
+    sort: str = "date",
+    min_sources: int = 0,
+) -> list[tuple]:
+    """Search IOCs with optional advanced filters, returning raw rows.
+
+    Each row is a tuple in ``SEARCH_COLUMNS`` order, as read from SQLite, so
+    callers that serialize many rows can skip building a dict per row.
+
+    On a sharded store every shard returns its first ``offset + limit`` rows
+    in sort order; those are merged and the requested page is cut from the
+    merged stream, so pages are the same as on a single file.
+
+    Args:
+        path: Database path
+        query: Search query string
+        ioc_type: Filter by IOC type
+        source: Filter by source
+        severity: Filter by severity
+        search_mode: "simple" (LIKE), "regex", or "cidr"
+        date_from: ISO date string (YYYY-MM-DD)
+        date_to: ISO date string (YYYY-MM-DD)
+        limit: Result limit
+        offset: Result offset
+        sort: "date" (newest first) or "score" (highest confidence first)
+        min_sources: Only IOCs reported by at least this many sources
+    """
+    if sort not in SORT_ORDERS:
+        raise ValueError(f"Unsupported sort: {sort}")
+    filters = {
+        "query": query,
+        "ioc_type": ioc_type,
+        "source": source,
+        "severity": severity,
+        "search_mode": search_mode,
+        "date_from": date_from,
+        "date_to": date_to,
+        "sort": sort,
+        "min_sources": min_sources,
+    }
+    if not is_sharded(path):
+        rows, scanned, seconds = _select_rows(path, limit=limit, offset=offset, **filters)
+    else:
+        started = time.perf_counter()
+        window = offset + limit if limit is not None else None
+        results = _fan_out(
+            functools.partial(_select_rows, limit=window, offset=0, **filters), _query_shards(path, ioc_type)
+        )
+        key = MERGE_KEYS[sort]
+        merged = heapq.merge(*(shard_rows for shard_rows, _, _ in results), key=key, reverse=True)
+        rows = list(itertools.islice(merged, offset, window))
+        scanned = sum(shard_scanned for _, shard_scanned, _ in results)
+        seconds = time.perf_counter() - started
+    SEARCH_QUERY_SECONDS.observe(seconds, mode=search_mode)
+    SEARCH_ROWS_SCANNED.observe(scanned, mode=search_mode)
+    return rows
+
+
+def search_iocs(
+    path: str,
+    query: str = "",
+    ioc_type: str = "",
+    source: str = "",
+    severity: str = "",
+    search_mode: str = "simple",
+    date_from: str = "",
+    date_to: str = "",
+    limit: int | None = None,
+    offset: int = 0,
+    sort: str = "date",
+    min_sources: int = 0,
+) -> list[dict]:
+    """Search IOCs with optional advanced filters, returning one dict per row.
+
+    Takes the same filters as ``search_rows``; each dict has the
+    ``SEARCH_COLUMNS`` keys.
+    """
+    rows = search_rows(
+        path,
+        query=query,
+        ioc_type=ioc_type,
+        source=source,
+        severity=severity,
+        search_mode=search_mode,
+        date_from=date_from,
+        date_to=date_to,
+        limit=limit,
+        offset=offset,
+        sort=sort,
+        min_sources=min_sources,
+    )
+    return [dict(zip(SEARCH_COLUMNS, row)) for row in rows]
 
 
 def count_iocs(
@@ -185,10 +600,30 @@ def count_iocs(
     search_mode: str = "simple",
     date_from: str = "",
     date_to: str = "",
+    min_sources: int = 0,
 ) -> int:
     """Count IOCs with optional advanced filters."""
-    # Use search_iocs with no limit to get all matching results
-    results = search_iocs(
+    if is_sharded(path):
+        count = functools.partial(
+            count_iocs,
+            query=query,
+            ioc_type=ioc_type,
+            source=source,
+            severity=severity,
+            search_mode=search_mode,
+            date_from=date_from,
+            date_to=date_to,
+            min_sources=min_sources,
+        )
+        return sum(_fan_out(count, _query_shards(path, ioc_type)))
+    if not query:
+        init_db(path)
+        filters, params = _search_filters(ioc_type, source, severity, date_from, date_to, min_sources)
+        with sqlite3.connect(path) as conn:
+            return int(conn.execute("SELECT COUNT(*)" + filters, params).fetchone()[0])
+
+    # Value queries are filtered in Python, so count the filtered search results
+    results = search_rows(
         path,
         query=query,
         ioc_type=ioc_type,
@@ -197,11 +632,101 @@ def count_iocs(
         search_mode=search_mode,
         date_from=date_from,
         date_to=date_to,
+        min_sources=min_sources,
     )
     return len(results)
 
 
+def suggest_iocs(path: str, prefix: str, ioc_type: str = "", limit: int = 10, scan_limit: int = 500) -> list[dict]:
+    """Complete ``prefix`` to stored IOC values, highest score first.
+
+    A range scan over the ``suggest_terms`` primary key reads at most
+    ``scan_limit`` matching terms, so short prefixes stay cheap; the
+    candidates are then ranked by score.
+    """
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return []
+    if is_sharded(path):
+        suggest = functools.partial(suggest_iocs, prefix=prefix, ioc_type=ioc_type, limit=limit, scan_limit=scan_limit)
+        candidates = itertools.chain.from_iterable(_fan_out(suggest, _query_shards(path, ioc_type)))
+        return sorted(candidates, key=lambda row: (-row["score"], len(row["value"]), row["value"]))[:limit]
+    init_db(path)
+    sql = """
+        SELECT iocs.type, iocs.value, iocs.source_count, iocs.score
+        FROM (
+            SELECT DISTINCT ioc_id FROM (
+                SELECT ioc_id FROM suggest_terms WHERE term >= ? AND term < ? ORDER BY term LIMIT ?
+            )
+        ) AS matched
+        JOIN iocs ON iocs.id = matched.ioc_id
+    """
+    params: list[object] = [prefix, prefix + "\U0010ffff", scan_limit]
+    if ioc_type:
+        sql += " WHERE LOWER(iocs.type) = ?"
+        params.append(ioc_type.lower())
+    sql += " ORDER BY iocs.score DESC, LENGTH(iocs.value), iocs.value LIMIT ?"
+    params.append(limit)
+    with sqlite3.connect(path) as conn:
+        rows = conn.execute(sql, params).fetchall()
+    return [
+        {"type": row[0], "value": row[1], "source_count": row[2], "score": row[3]}
+        for row in rows
+    ]
+
+
+def iter_ioc_values(path: str) -> Iterator[tuple[str, str]]:
+    """Yield ``(type, value)`` for every stored IOC without loading them all at once."""
+    if is_sharded(path):
+        for shard in shard_paths(path):
+            yield from iter_ioc_values(shard)
+        return
+    init_db(path)
+    with sqlite3.connect(path) as conn:
+        yield from conn.execute("SELECT type, value FROM iocs")
+
+
+def iter_ioc_records(path: str) -> Iterator[tuple[str, str, list[tuple[str, str, str]]]]:
+    """Yield ``(type, value, [(source, severity, date_added), ...])`` per stored IOC."""
+    if is_sharded(path):
+        for shard in shard_paths(path):
+            yield from iter_ioc_records(shard)
+        return
+    init_db(path)
+    sql = (
+        "SELECT iocs.id, iocs.type, iocs.value, ioc_sources.source, ioc_sources.severity, ioc_sources.date_added "
+        "FROM iocs JOIN ioc_sources ON ioc_sources.ioc_id = iocs.id ORDER BY iocs.id, ioc_sources.source"
+    )
+    with sqlite3.connect(path) as conn:
+        current = None
+        record = None
+        for ioc_id, ioc_type, value, source, severity, date_added in conn.execute(sql):
+            if ioc_id != current:
+                if record is not None:
+                    yield record
+                current = ioc_id
+                record = (ioc_type, value, [])
+            record[2].append((source, severity, date_added))
+        if record is not None:
+            yield record
+
+
 def get_stats(path: str) -> dict:
+    if is_sharded(path):
+        paths = shard_paths(path)
+        stats = _fan_out(get_stats, paths)
+        filters = _fan_out(get_filter_values, paths)
+        by_type: Counter = Counter()
+        for shard_stats in stats:
+            by_type.update(shard_stats["by_type"])
+        updated = [shard_stats["last_updated"] for shard_stats in stats if shard_stats["last_updated"]]
+        return {
+            "total_iocs": sum(shard_stats["total_iocs"] for shard_stats in stats),
+            "total_records": sum(shard_stats["total_records"] for shard_stats in stats),
+            "total_sources": len(set().union(*(shard_filters["sources"] for shard_filters in filters))),
+            "last_updated": max(updated) if updated else None,
+            "by_type": dict(sorted(by_type.items())),
+        }
     init_db(path)
     with sqlite3.connect(path) as conn:
         total_iocs = int(conn.execute("SELECT COUNT(*) FROM iocs").fetchone()[0])
@@ -222,6 +747,12 @@ def get_stats(path: str) -> dict:
 
 
 def get_filter_values(path: str) -> dict:
+    if is_sharded(path):
+        filters = _fan_out(get_filter_values, shard_paths(path))
+        return {
+            key: sorted(set().union(*(shard_filters[key] for shard_filters in filters)))
+            for key in ("sources", "types", "severities")
+        }
     init_db(path)
     with sqlite3.connect(path) as conn:
         sources = [row[0] for row in conn.execute("SELECT DISTINCT source FROM ioc_sources ORDER BY source")]
@@ -3,6 +3,24 @@ import logging
 import os
 
 
+class _EventFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return isinstance(getattr(record, "event", None), dict)
+
+
+class JsonEventFormatter(logging.Formatter):
+    """Format records logged with ``extra={"event": {...}}`` as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "msg": record.getMessage(),
+        }
+        payload.update(record.event)
+        return json.dumps(payload, sort_keys=True)
+
+
 def configure_logging(log_path: str) -> logging.Logger:
     logger = logging.getLogger("aggregator")
     if logger.handlers:
@@ -20,6 +38,12 @@ def configure_logging(log_path: str) -> logging.Logger:
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
 
+    # Structured timings go to a sibling .jsonl file so runs can be compared offline.
+    event_handler = logging.FileHandler(os.path.splitext(log_path)[0] + ".jsonl", encoding="utf-8")
+    event_handler.setFormatter(JsonEventFormatter())
+    event_handler.addFilter(_EventFilter())
+    logger.addHandler(event_handler)
+
     return logger
 
 
@@ -33,3 +57,8 @@ def load_feeds_config(path: str) -> list[dict]:
             continue
         normalized.append(feed)
     return normalized
+
+
+def state_path(db_path: str, filename: str) -> str:
+    """Return the path of a runtime state file kept next to the IOC database."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), filename)
@@ -0,0 +1,77 @@
+// Search box autocomplete backed by /api/suggest
+(function () {
+  const DEBOUNCE_MS = 150;
+  const MIN_PREFIX = 2;
+  const LIMIT = 10;
+
+  let timer = null;
+  let controller = null;
+  let lastPrefix = '';
+
+  // Only simple searches complete to values; regex and CIDR input is left alone
+  function suggestionsEnabled() {
+    const mode = document.getElementById('search-mode');
+    return !mode || mode.value === 'simple';
+  }
+
+  function render(list, items) {
+    list.replaceChildren(
+      ...items.map(function (item) {
+        const option = document.createElement('option');
+        option.value = item.value;
+        option.label = `${item.type} · ${item.source_count} source(s)`;
+        return option;
+      })
+    );
+  }
+
+  // Fetch completions, cancelling any request still in flight
+  function fetchSuggestions(input, list) {
+    const prefix = input.value.trim();
+    if (prefix.length < MIN_PREFIX || !suggestionsEnabled()) {
+      lastPrefix = '';
+      render(list, []);
+      return;
+    }
+    if (prefix === lastPrefix) return;
+    lastPrefix = prefix;
+    if (controller) controller.abort();
+    controller = new AbortController();
+
+    const params = new URLSearchParams({ prefix: prefix, limit: LIMIT });
+    const type = document.querySelector('select[name="type"]');
+    if (type && type.value) params.set('type', type.value);
+
+    fetch(`/api/suggest?${params}`, { signal: controller.signal })
+      .then(function (response) { return response.json(); })
+      .then(function (body) {
+        if (body.status === 'success' && input.value.trim() === prefix) {
+          render(list, body.data);
+        }
+      })
+      .catch(function () { /* aborted or offline: keep the previous list */ });
+  }
+
+  // Initialize on page load
+  function init() {
+    const input = document.getElementById('query-input');
+    if (!input) return;
+    const list = document.createElement('datalist');
+    list.id = 'query-suggestions';
+    input.after(list);
+    input.setAttribute('list', list.id);
+    input.setAttribute('autocomplete', 'off');
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(function () { fetchSuggestions(input, list); }, DEBOUNCE_MS);
+    });
+  }
+
+  // Run when DOM is ready
+  if (document.readyState === 'loading') {
+    document.addEventListener('DOMContentLoaded', init);
+  } else {
+    init();
+  }
+})();
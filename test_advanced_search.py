@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 """Test advanced search functionality."""
 
-from src.aggregator.store import search_iocs, count_iocs
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.store import search_iocs, count_iocs
 
 print("Testing advanced search functionality...\n")
 
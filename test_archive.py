@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test the raw feed archive used by the replay command."""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.archive import FeedArchive, iter_blob
+from aggregator.bench import serve_directory
+from aggregator.cli import _ingest_feed, _replay_entry
+
+
+def _archive(archive: FeedArchive, body: bytes, feed: str, fetched_at: str) -> bytes:
+    chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+    return b"".join(archive.tee(chunks, {"feed": feed, "format": "txt", "fetched_at": fetched_at}))
+
+
+def test_round_trip_and_content_addressing():
+    with tempfile.TemporaryDirectory() as root:
+        archive = FeedArchive(root)
+        body = b"1.2.3.4\nevil.com\n" * 50
+        assert _archive(archive, body, "a", "2024-01-01T00:00:00Z") == body
+        _archive(archive, body, "a", "2024-01-02T00:00:00Z")
+
+        entries = archive.entries()
+        assert len(entries) == 2
+        assert entries[0]["path"] == entries[1]["path"]
+        assert entries[0]["size"] == len(body)
+        assert b"".join(iter_blob(root, entries[1])) == body
+        assert [e["fetched_at"][:10] for e in archive.entries(since="2024-01-02")] == ["2024-01-02"]
+        assert archive.entries(feeds=["b"]) == []
+
+
+def test_abandoned_download_is_not_archived():
+    with tempfile.TemporaryDirectory() as root:
+        archive = FeedArchive(root)
+        stream = archive.tee([b"1.2.3.4\n", b"5.6.7.8\n"], {"feed": "a", "fetched_at": "2024-01-01T00:00:00Z"})
+        next(stream)
+        stream.close()
+        assert archive.entries() == []
+        assert os.listdir(os.path.join(root, "tmp")) == []
+
+
+def test_fetch_archives_complete_bodies_for_every_format():
+    bodies = {
+        # Parsing stops at the end of "data"; the trailing "meta" must still be archived.
+        "json": json.dumps({"data": [{"value": "evil.com"}, {"value": "1.2.3.4"}], "meta": {"n": 2}}).encode(),
+        "csv": b"value,severity\nevil.com,high\n1.2.3.4,low\n",
+        "txt": b"evil.com\n1.2.3.4\n",
+    }
+    args = argparse.Namespace(timeout=5, retries=0, backoff=0, max_per_feed=0)
+    with tempfile.TemporaryDirectory() as root:
+        feeds_dir = os.path.join(root, "feeds")
+        os.makedirs(feeds_dir)
+        for feed_format, body in bodies.items():
+            with open(os.path.join(feeds_dir, f"feed.{feed_format}"), "wb") as handle:
+                handle.write(body)
+        archive = FeedArchive(os.path.join(root, "archive"))
+        server, base_url = serve_directory(feeds_dir)
+        try:
+            for feed_format in bodies:
+                feed = {"name": feed_format, "url": f"{base_url}/feed.{feed_format}", "format": feed_format}
+                timings = {}
+                iocs = _ingest_feed(feed, args, timings, set(), archive)
+                assert sorted(ioc.value for ioc in iocs) == ["1.2.3.4", "evil.com"]
+                assert min(timings[stage] for stage in ("fetch", "archive", "parse")) >= 0
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        entries = {entry["feed"]: entry for entry in archive.entries()}
+        assert sorted(entries) == ["csv", "json", "txt"]
+        for feed_format, body in bodies.items():
+            assert entries[feed_format]["size"] == len(body)
+            assert b"".join(iter_blob(archive.root, entries[feed_format])) == body
+
+
+def test_replay_decodes_with_the_archived_charset():
+    with tempfile.TemporaryDirectory() as root:
+        archive = FeedArchive(root)
+        body = "bücher.de\n".encode("latin-1")
+        metadata = {"feed": "a", "format": "txt", "fetched_at": "2024-01-01T00:00:00Z", "encoding": "latin-1"}
+        b"".join(archive.tee([body], metadata))
+        iocs, _ = _replay_entry(root, archive.entries()[0])
+        assert [ioc.value for ioc in iocs] == ["xn--bcher-kva.de"]
+
+
+def test_size_cap_drops_oldest_bodies():
+    with tempfile.TemporaryDirectory() as root:
+        archive = FeedArchive(root, max_bytes=200)
+        for day in range(1, 6):
+            _archive(archive, os.urandom(100), "a", f"2024-01-0{day}T00:00:00Z")
+        entries = archive.entries()
+        assert [e["fetched_at"][:10] for e in entries] == ["2024-01-05"]
+        assert sum(e["stored_size"] for e in entries) <= 200
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All archive tests passed!")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Smoke-test the benchmark suite: corpus generation, report schema and cleanup."""
+
+import contextlib
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator import bench
+from aggregator.bench import API_CASES, CORPUS_FEEDS, REPORT_VERSION, SEARCH_CASES, generate_corpus, run_benchmarks
+from aggregator.parsers import parse_feed
+
+
+@contextlib.contextmanager
+def _temp_root():
+    """Point tempfile at a fresh directory so leftovers of a bench run are visible."""
+    saved = tempfile.tempdir
+    with tempfile.TemporaryDirectory() as root:
+        tempfile.tempdir = root
+        try:
+            yield root
+        finally:
+            tempfile.tempdir = saved
+
+
+def test_generate_corpus_is_deterministic_and_parseable():
+    with tempfile.TemporaryDirectory() as root:
+        feeds = generate_corpus(os.path.join(root, "a"), 500, seed=7)
+        again = generate_corpus(os.path.join(root, "b"), 500, seed=7)
+        assert [feed["name"] for feed in feeds] == [spec["name"] for spec in CORPUS_FEEDS]
+        for feed, other in zip(feeds, again):
+            with open(feed["path"], "rb") as handle, open(other["path"], "rb") as copy:
+                body = handle.read()
+                assert body == copy.read()
+            assert feed["bytes"] == len(body)
+            assert len(list(parse_feed(body.decode("utf-8"), feed["format"]))) == feed["count"]
+        assert abs(sum(feed["count"] for feed in feeds) - 500) <= len(feeds)
+
+
+def test_run_benchmarks_report_schema():
+    with _temp_root() as root:
+        report = run_benchmarks(200, repeat=1)
+        assert os.listdir(root) == [], "bench left its workdir behind"
+
+    assert report["report_version"] == REPORT_VERSION
+    assert {"generated_at", "python", "platform", "size", "shards", "seed", "repeat", "corpus"} <= set(report)
+    assert report["corpus"]["iocs"] >= report["corpus"]["inserted"] > 0
+    results = report["results"]
+    expected = {"generate", "fetch", "parse", "normalize", "upsert", "export", "snapshot_build"}
+    expected |= {f"feed:{spec['name']}" for spec in CORPUS_FEEDS}
+    expected |= {case["name"] for case in SEARCH_CASES} | {name for name, _ in API_CASES}
+    assert expected <= set(results), sorted(expected - set(results))
+    assert {"seconds", "count", "per_second"} <= set(results["upsert"])
+    assert results["fetch"]["count"] == report["corpus"]["bytes"]
+    assert all(results[name]["status"] == 200 for name, _ in API_CASES)
+
+
+def test_failed_stage_still_cleans_up():
+    def broken_export(db_path: str, path: str) -> None:
+        raise OSError("disk full")
+
+    export = bench.export_iocs
+    bench.export_iocs = broken_export
+    try:
+        with _temp_root() as root:
+            failed = False
+            try:
+                run_benchmarks(100, repeat=1)
+            except OSError:
+                failed = True
+            assert failed, "export failure was swallowed"
+            assert os.listdir(root) == []
+    finally:
+        bench.export_iocs = export
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All bench tests passed!")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test the Unix-socket lookup daemon used by repeated CLI searches."""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.daemon import create_server, request_daemon
+from aggregator.normalizer import normalize_items
+from aggregator.snapshot import write_snapshot
+from aggregator.store import search_iocs, upsert_iocs
+
+
+def _seed(db_path: str) -> None:
+    upsert_iocs(db_path, normalize_items(["1.2.3.4", "evil.com", "10.0.0.0/8"], source="a", default_severity="high"))
+    upsert_iocs(db_path, normalize_items(["evil.com"], source="b", default_severity="low"))
+
+
+def _serving(root: str, snapshot_path: str = ""):
+    db_path = os.path.join(root, "iocs.db")
+    socket_path = os.path.join(root, "lookup.sock")
+    _seed(db_path)
+    server = create_server(db_path, socket_path, snapshot_path)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, db_path, socket_path
+
+
+def test_search_and_ping_over_socket():
+    with tempfile.TemporaryDirectory() as root:
+        server, db_path, socket_path = _serving(root)
+        try:
+            assert os.stat(socket_path).st_mode & 0o077 == 0
+            response = request_daemon(socket_path, {"query": "evil", "limit": 10})
+            assert response["status"] == "success"
+            assert response["data"] == search_iocs(db_path, query="evil", limit=10)
+            assert {row["source"] for row in response["data"]} == {"a", "b"}
+            assert request_daemon(socket_path, {"op": "ping"})["data"] == {"db": db_path}
+            assert request_daemon(socket_path, {"op": "nope"}) == {"status": "error", "message": "Unsupported op: nope"}
+            assert request_daemon(socket_path, {"sort": "nope"})["status"] == "error"
+            # Without a snapshot the lookup op reports it rather than failing the connection.
+            assert request_daemon(socket_path, {"op": "lookup", "value": "1.2.3.4"})["status"] == "error"
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_lookup_and_pipelined_requests():
+    with tempfile.TemporaryDirectory() as root:
+        snapshot_path = os.path.join(root, "lookup.snap")
+        db_path = os.path.join(root, "iocs.db")
+        _seed(db_path)
+        write_snapshot(db_path, snapshot_path)
+        server, _, socket_path = _serving(root, snapshot_path)
+        try:
+            response = request_daemon(socket_path, {"op": "lookup", "value": "10.1.2.3"})
+            assert response["status"] == "success"
+            assert [match["value"] for match in response["data"]] == ["10.0.0.0/8"]
+
+            # One connection, several NDJSON lines in, one response line per request out.
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+                client.connect(socket_path)
+                client.sendall(b'{"op": "ping"}\n\nnot json\n{"query": "1.2.3.4"}\n')
+                client.shutdown(socket.SHUT_WR)
+                lines = client.makefile("rb").read().splitlines()
+            assert len(lines) == 3
+            assert b'"success"' in lines[0] and b'"error"' in lines[1] and b"1.2.3.4" in lines[2]
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_stale_socket_is_replaced_and_live_socket_refused():
+    with tempfile.TemporaryDirectory() as root:
+        server, db_path, socket_path = _serving(root)
+        try:
+            refused = False
+            try:
+                create_server(db_path, socket_path)
+            except ValueError:
+                refused = True
+            assert refused, "second daemon bound over a live socket"
+        finally:
+            server.shutdown()
+            server.server_close()
+        # The socket file outlives a crashed daemon; the next one takes it over.
+        assert os.path.exists(socket_path)
+        server = create_server(db_path, socket_path)
+        server.server_close()
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All daemon tests passed!")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test Prometheus text rendering, stage timing and the /metrics endpoint."""
+
+import os
+import re
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.app import create_app
+from aggregator.metrics import INGEST_METRICS_FILE, Registry, _Metric, timed_iter
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+LABEL = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)="((?:[^"\\]|\\.)*)"')
+
+
+def _parse(text: str) -> tuple[dict, dict]:
+    """Parse exposition text into ({(name, labels): value}, {name: type})."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            types[name] = kind
+            continue
+        if not line or line.startswith("#"):
+            continue
+        match = SAMPLE.match(line)
+        assert match, f"malformed sample line: {line!r}"
+        name, labels, value = match.groups()
+        pairs = LABEL.findall(labels or "")
+        assert ",".join(f'{k}="{v}"' for k, v in pairs) == (labels or ""), f"malformed labels: {labels!r}"
+        samples[(name, tuple(pairs))] = float(value)
+    return samples, types
+
+
+def test_counter_and_histogram_rendering():
+    registry = Registry()
+    counter = registry.counter("feed_bytes_total", "Bytes", ("feed",))
+    histogram = registry.histogram("stage_seconds", "Stage time", ("stage",), buckets=(0.1, 1.0))
+    counter.inc(3, feed='odd "name"\\\n')
+    counter.inc(2.5, feed='odd "name"\\\n')
+    for value in (0.05, 0.5, 0.5, 7):
+        histogram.observe(value, stage="parse")
+
+    samples, types = _parse(registry.render())
+    assert types == {"feed_bytes_total": "counter", "stage_seconds": "histogram"}
+    assert samples[("feed_bytes_total", (("feed", 'odd \\"name\\"\\\\\\n'),))] == 5.5
+    buckets = [
+        samples[("stage_seconds_bucket", (("stage", "parse"), ("le", le)))] for le in ("0.1", "1", "+Inf")
+    ]
+    assert buckets == [1, 3, 4]
+    assert samples[("stage_seconds_sum", (("stage", "parse"),))] == 8.05
+    assert samples[("stage_seconds_count", (("stage", "parse"),))] == 4
+
+    rejected = False
+    try:
+        _Metric("x", "y")
+    except TypeError:
+        rejected = True
+    assert rejected, "abstract metric was instantiated"
+
+
+def test_timed_iter_counts_items_and_accumulates_time():
+    timings = {"parse": 1.0}
+    assert list(timed_iter(iter("abc"), timings, "parse", count_key="rows")) == ["a", "b", "c"]
+    assert timings["rows"] == 3 and timings["parse"] >= 1.0
+    assert list(timed_iter([], timings, "empty")) == [] and timings["empty"] >= 0.0
+
+
+def test_metrics_endpoint_serves_request_and_ingest_metrics():
+    with tempfile.TemporaryDirectory() as root:
+        db_path = os.path.join(root, "iocs.db")
+        ingest = Registry()
+        ingest.counter("aggregator_ingest_failures_total", "Failed feed runs", ("feed",)).inc(feed="a")
+        ingest.write_textfile(os.path.join(root, INGEST_METRICS_FILE))
+
+        client = create_app(db_path).test_client()
+        assert client.get("/api/health").status_code == 200
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.mimetype == "text/plain"
+
+        samples, types = _parse(response.get_data(as_text=True))
+        assert types["aggregator_http_request_seconds"] == "histogram"
+        labels = (("endpoint", "/api/health"), ("method", "GET"), ("status", "200"))
+        assert samples[("aggregator_http_request_seconds_count", labels)] >= 1
+        assert samples[("aggregator_http_request_seconds_bucket", labels + (("le", "+Inf"),))] >= 1
+        assert samples[("aggregator_ingest_failures_total", (("feed", "a"),))] == 1
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All metrics tests passed!")
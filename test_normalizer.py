@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Test IOC canonicalization and in-run deduplication."""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.normalizer import canonicalize, dedupe_iocs, detect_type, normalize_items
+from aggregator.store import search_iocs, upsert_iocs
+
+
+def test_equivalent_spellings_collapse():
+    cases = [
+        (["EVIL.com", "evil.com.", "evil.COM"], ("domain", "evil.com")),
+        (["http://x.com/", "HTTP://X.com", "http://x.com:80/"], ("url", "http://x.com")),
+        (["2001:DB8:0:0::1", "2001:db8::0001"], ("ip", "2001:db8::1")),
+        (["1.2.3.4/32", "1.2.3.4", "::ffff:1.2.3.4"], ("ip", "1.2.3.4")),
+        (["bücher.de", "xn--bcher-kva.de"], ("domain", "xn--bcher-kva.de")),
+    ]
+    for spellings, expected in cases:
+        iocs = normalize_items(spellings, source="feed", default_severity="high")
+        assert {(ioc.type, ioc.value) for ioc in iocs} == {expected}, spellings
+
+
+def test_canonicalize_keeps_meaningful_parts():
+    assert canonicalize("ip", "10.1.2.3/8") == "10.0.0.0/8"
+    assert canonicalize("url", "https://Ex.com:8443/Path/?Q=1") == "https://ex.com:8443/Path/?Q=1"
+    assert canonicalize("url", "http://[2001:DB8::1]/") == "http://[2001:db8::1]"
+    assert canonicalize("hash", "ABCDEF") == "ABCDEF"
+    assert detect_type("not a domain") == "unknown"
+
+
+def test_explicit_type_is_canonicalized():
+    iocs = normalize_items([{"value": "Evil.com.", "type": "domain"}], source="feed", default_severity=None)
+    assert iocs[0].value == "evil.com"
+    assert iocs[0].severity == "medium"
+
+
+def test_non_string_type_and_severity_are_kept():
+    items = [
+        {"value": "1.2.3.4", "severity": 3},
+        {"value": "evil.com", "type": None, "severity": None},
+        {"value": "5.6.7.8", "type": 4, "severity": 0.5},
+    ]
+    iocs = normalize_items(items, source="feed", default_severity="high")
+    assert [(ioc.type, ioc.value, ioc.severity) for ioc in iocs] == [
+        ("ip", "1.2.3.4", 3),
+        ("domain", "evil.com", "high"),
+        (4, "5.6.7.8", 0.5),
+    ]
+    with tempfile.TemporaryDirectory() as root:
+        db_path = os.path.join(root, "iocs.db")
+        assert upsert_iocs(db_path, iocs) == 3
+        assert {(row["type"], row["severity"]) for row in search_iocs(db_path)} == {
+            ("ip", "3"),
+            ("domain", "high"),
+            ("4", "0.5"),
+        }
+
+
+def test_dedupe_across_run():
+    seen = set()
+    first = dedupe_iocs(normalize_items(["1.2.3.4", "1.2.3.4/32", "5.6.7.8"], "a", None), seen)
+    second = dedupe_iocs(normalize_items(["1.2.3.4", "5.6.7.8"], "a", None), seen)
+    other_source = dedupe_iocs(normalize_items(["1.2.3.4"], "b", None), seen)
+    assert [ioc.value for ioc in first] == ["1.2.3.4", "5.6.7.8"]
+    assert second == []
+    assert len(other_source) == 1
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All normalizer tests passed!")
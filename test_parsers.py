@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Test incremental feed parsers against chunk boundaries."""
+
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.parsers import parse_feed, parse_feed_stream
+
+CHUNK_SIZES = (1, 2, 3, 7, 64 * 1024)
+
+
+def _chunks(text: str, size: int) -> list[bytes]:
+    data = text.encode("utf-8")
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+def _expected_json(text: str) -> list:
+    data = json.loads(text)
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        for key in ("data", "items", "iocs"):
+            if isinstance(data.get(key), list):
+                return data[key]
+    return []
+
+
+def test_json_matches_json_loads():
+    documents = [
+        '[1, 22, 333, {"a": "bü"}, [1, 2], null, true, -1.5e3]',
+        '{"meta": {"x": [1, {"y": "]"}]}, "count": 12345, "data": [{"ioc": "1.2.3.4"}, {"ioc": "ü.com"}]}',
+        '{"items": "not a list", "iocs": [7]}',
+        '{"items": [], "data": [1]}',
+        '{"iocs": [3], "items": [2, {"data": [9]}], "data": "not a list"}',
+        '{"iocs": [3], "data": [1], "items": [2]}',
+        '{"query_status": "no_result"}',
+        "[]",
+        '"scalar"',
+    ]
+    for document in documents:
+        for size in CHUNK_SIZES:
+            got = list(parse_feed_stream(_chunks(document, size), "json"))
+            assert got == _expected_json(document), (document, size)
+
+
+def test_json_rejects_truncated_input():
+    try:
+        list(parse_feed_stream(_chunks('{"data": [{"ioc": "1.2.3.4"}, {"io', 4), "json"))
+    except ValueError:
+        return
+    raise AssertionError("truncated JSON was accepted")
+
+
+def test_csv_single_pass_header_sniffing():
+    with_header = 'Value,Note\n1.2.3.4,"multi\nline"\n\n5.6.7.8\nx,y,z\n'
+    for size in CHUNK_SIZES:
+        rows = list(parse_feed_stream(_chunks(with_header, size), "csv"))
+        assert rows == [
+            {"value": "1.2.3.4", "note": "multi\nline"},
+            {"value": "5.6.7.8", "note": None},
+            {"value": "x", "note": "y", None: ["z"]},
+        ]
+    assert parse_feed("1.2.3.4,a\r\n5.6.7.8,b", "csv") == [{"value": "1.2.3.4"}, {"value": "5.6.7.8"}]
+
+
+def test_txt_skips_comments_and_blank_lines():
+    text = "\ufeff# header\r\n1.2.3.4\r\n\n  evil.com  \nlast"
+    for size in CHUNK_SIZES:
+        assert list(parse_feed_stream(_chunks(text, size), "txt")) == ["1.2.3.4", "evil.com", "last"]
+
+
+def test_txt_splits_on_universal_newlines():
+    text = "1.2.3.4\r5.6.7.8\r\nevil.com\r\rbad.org\x0cgood.net\u2028last\r"
+    expected = ["1.2.3.4", "5.6.7.8", "evil.com", "bad.org", "good.net", "last"]
+    assert list(parse_feed(text, "txt")) == expected
+    for size in CHUNK_SIZES:
+        assert list(parse_feed_stream(_chunks(text, size), "txt")) == expected
+    # A CRLF split across chunks is one line break, not a blank line plus a break.
+    assert list(parse_feed_stream([b"1.2.3.4\r", b"\n5.6.7.8\r", b"\n"], "txt")) == ["1.2.3.4", "5.6.7.8"]
+
+
+
+def test_declared_charset_is_honoured():
+    text = "café.example\nnaïve.org\n"
+    for encoding in ("ISO-8859-1", "cp1252", "utf-16"):
+        body = text.encode(encoding)
+        chunks = [body[i : i + 3] for i in range(0, len(body), 3)]
+        assert list(parse_feed_stream(chunks, "txt", encoding)) == ["café.example", "naïve.org"], encoding
+    body = json.dumps({"data": ["ü.com"]}, ensure_ascii=False).encode("latin-1")
+    assert list(parse_feed_stream([body], "json", "latin-1")) == ["ü.com"]
+    # Unknown or missing charsets fall back to UTF-8.
+    assert list(parse_feed_stream(["ü.com".encode()], "txt", "x-unknown")) == ["ü.com"]
+    assert list(parse_feed_stream(["\ufeffü.com".encode()], "txt", "UTF8")) == ["ü.com"]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All parser tests passed!")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Test the opt-in profiler: admin token gate, shared tracemalloc and report pruning."""
+
+import contextlib
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.app import create_app
+from aggregator.profiling import Profiler, prune_profiles
+
+TOKEN = "s3cret-token"
+
+
+@contextlib.contextmanager
+def _client(admin_token: str):
+    with tempfile.TemporaryDirectory() as root:
+        profile_dir = os.path.join(root, "profiles")
+        env = {"AGGREGATOR_ADMIN_TOKEN": admin_token, "AGGREGATOR_PROFILE_DIR": profile_dir}
+        saved = {name: os.environ.get(name) for name in env}
+        os.environ.update(env)
+        try:
+            yield create_app(os.path.join(root, "iocs.db")).test_client(), profile_dir
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def _reports(profile_dir: str) -> list[str]:
+    return sorted(os.listdir(profile_dir)) if os.path.isdir(profile_dir) else []
+
+
+def test_profile_param_requires_admin_token():
+    # With no token configured, profiling is never available.
+    with _client("") as (client, profile_dir):
+        assert client.get("/api/stats?profile=1").status_code == 403
+        assert client.get("/api/stats?profile=1", headers={"X-Admin-Token": ""}).status_code == 403
+        assert _reports(profile_dir) == []
+
+    with _client(TOKEN) as (client, profile_dir):
+        assert client.get("/api/stats?profile=1").status_code == 403
+        assert client.get("/api/stats?profile=1", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        assert client.get("/api/stats", headers={"X-Admin-Token": TOKEN}).status_code == 200
+        assert _reports(profile_dir) == []
+
+        response = client.get("/api/stats?profile=1", headers={"X-Admin-Token": TOKEN})
+        assert response.status_code == 200 and response.get_json()["status"] == "success"
+        reports = _reports(profile_dir)
+        assert len(reports) == 2 and all("-api-api_stats." in name for name in reports)
+        assert sorted(name.split(".", 1)[1] for name in reports) == ["alloc.txt", "pstats"]
+        assert not tracemalloc.is_tracing()
+
+
+def test_overlapping_profilers_share_tracemalloc():
+    with tempfile.TemporaryDirectory() as root:
+        outer = Profiler(root, "outer").start()
+        inner = Profiler(root, "inner").start()
+        assert tracemalloc.is_tracing()
+        inner.stop()
+        assert tracemalloc.is_tracing(), "first stop ended tracing for the other profiler"
+        stats_path = outer.stop()
+        assert not tracemalloc.is_tracing()
+        assert os.path.exists(stats_path)
+        assert outer.stop() == ""
+
+
+def test_prune_keeps_most_recent_runs():
+    with tempfile.TemporaryDirectory() as root:
+        runs = [f"20240101T00000{second}000000-1-1-run" for second in range(4)]
+        for run_id in runs:
+            for suffix in (".pstats", ".alloc.txt"):
+                open(os.path.join(root, run_id + suffix), "w").close()
+        open(os.path.join(root, "notes.txt"), "w").close()
+        prune_profiles(root, keep=2)
+        assert _reports(root) == sorted(
+            ["notes.txt"] + [run_id + suffix for run_id in runs[2:] for suffix in (".pstats", ".alloc.txt")]
+        )
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All profiling tests passed!")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Test JSON serialization, response shapes and content negotiation for the REST API."""
+
+import gzip
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from flask import Flask
+
+from aggregator import responses
+from aggregator.responses import dumps, json_response, negotiate_encoding, shape_rows
+
+COLUMNS = ("type", "value", "score")
+ROWS = [("ip", "1.2.3.4", 9), ("domain", "évil.com", 3)]
+
+
+def test_shapes():
+    assert shape_rows(COLUMNS, ROWS) == [
+        {"type": "ip", "value": "1.2.3.4", "score": 9},
+        {"type": "domain", "value": "évil.com", "score": 3},
+    ]
+    assert shape_rows(COLUMNS, ROWS, "columnar") == {
+        "type": ["ip", "domain"],
+        "value": ["1.2.3.4", "évil.com"],
+        "score": [9, 3],
+    }
+    assert shape_rows(COLUMNS, [], "columnar") == {"type": [], "value": [], "score": []}
+    try:
+        shape_rows(COLUMNS, ROWS, "nope")
+    except ValueError:
+        return
+    raise AssertionError("unknown shape was accepted")
+
+
+def test_dumps_matches_stdlib():
+    payload = {"status": "success", "data": shape_rows(COLUMNS, ROWS)}
+    assert json.loads(dumps(payload)) == payload
+
+
+def test_negotiate_encoding():
+    assert negotiate_encoding("") is None
+    assert negotiate_encoding("gzip, deflate") == "gzip"
+    assert negotiate_encoding("gzip;q=0") is None
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("*") == responses.AVAILABLE_ENCODINGS[0]
+    # Unavailable codings are never picked, whatever their weight.
+    assert negotiate_encoding("compress;q=1, gzip;q=0.1") == "gzip"
+
+
+def test_json_response_compresses_large_bodies():
+    app = Flask(__name__)
+    payload = {"data": [{"value": f"10.0.0.{i}"} for i in range(200)]}
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = json_response(payload)
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["Vary"]
+        assert json.loads(gzip.decompress(response.get_data())) == payload
+    with app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = json_response({"data": []}, status=201)
+        assert "Content-Encoding" not in response.headers
+        assert response.status_code == 201
+        assert json.loads(response.get_data()) == {"data": []}
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All response tests passed!")
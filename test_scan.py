@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test log scanning: extraction, matching structures and range splitting."""
+
+import gzip
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.scan import IocMatcher, scan_files, split_file
+
+IOCS = [
+    ("ip", "1.2.3.4"),
+    ("ip", "10.0.0.0/8"),
+    ("ip", "10.1.0.0/16"),
+    ("ip", "2001:db8::/32"),
+    ("domain", "evil.com"),
+    ("url", "http://bad.org/x"),
+]
+LOG = (
+    "ts=12:34:56 src=1.2.3.4 dst=10.1.9.9 host=www.good.com\n"
+    "GET http://BAD.org:80/x) from 10.200.0.1 via notevil.com\n"
+    "dns query a.b.EVIL.com. [2001:db8::5] 1.2.3.4.5 http://bad.org/other\n"
+)
+
+
+def _hits(path: str, **kwargs) -> list[tuple]:
+    matcher = IocMatcher(IOCS)
+    hits = [hit for result in scan_files(matcher, [path], **kwargs) for hit in result[0]]
+    return [(hit["offset"], hit["observed"], hit["ioc"], hit["match"]) for hit in hits]
+
+
+def test_matcher_structures():
+    matcher = IocMatcher(IOCS)
+    assert matcher.match_ip("10.1.2.3") == ("ip", "10.1.0.0/16", "cidr")
+    assert matcher.match_ip("10.2.2.3") == ("ip", "10.0.0.0/8", "cidr")
+    assert matcher.match_ip("11.0.0.0") is None
+    assert matcher.match_ip("::ffff:1.2.3.4") == ("ip", "1.2.3.4", "exact")
+    assert matcher.match_domain("x.Evil.com") == ("domain", "evil.com", "suffix")
+    assert matcher.match_domain("notevil.com") is None
+    assert matcher.match_url("HTTP://bad.org/x") == ("url", "http://bad.org/x", "exact")
+    assert matcher.match_url("https://cdn.evil.com/a") == ("domain", "evil.com", "suffix")
+    assert len(matcher) == 6
+
+
+def test_scan_reports_offsets():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "a.log")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(LOG)
+        hits = _hits(path)
+        assert [(ioc, how) for _, _, ioc, how in hits] == [
+            ("1.2.3.4", "exact"),
+            ("10.1.0.0/16", "cidr"),
+            ("http://bad.org/x", "exact"),
+            ("10.0.0.0/8", "cidr"),
+            ("evil.com", "suffix"),
+            ("2001:db8::/32", "cidr"),
+        ]
+        data = LOG.encode()
+        for offset, observed, _, _ in hits:
+            assert data[offset : offset + len(observed)] == observed.encode()
+
+        with gzip.open(path + ".gz", "wt", encoding="utf-8") as handle:
+            handle.write(LOG)
+        assert _hits(path + ".gz") == hits
+
+
+def test_ranges_split_on_newlines():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "big.log")
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(LOG * 200)
+        ranges = split_file(path, chunk_bytes=1000)
+        assert len(ranges) > 1
+        assert ranges[0][1] == 0 and ranges[-1][2] == os.path.getsize(path)
+        assert all(prev[2] == nxt[1] for prev, nxt in zip(ranges, ranges[1:]))
+        whole = _hits(path)
+        assert len(whole) == 6 * 200
+        assert _hits(path, chunk_bytes=1000) == whole
+        assert _hits(path, chunk_bytes=1000, workers=2) == whole
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All scan tests passed!")
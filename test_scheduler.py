@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Test the per-feed scheduler: anchored due times, retry backoff and the status file."""
+
+import contextlib
+import heapq
+import os
+import sys
+import tempfile
+from concurrent.futures import Future
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator import scheduler
+from aggregator.app import create_app
+from aggregator.scheduler import RETRY_BASE, FeedScheduler, load_status
+
+EPOCH = 1_700_000_000
+
+
+class _Clock:
+    """Stands in for the ``time`` module inside the scheduler."""
+
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def perf_counter(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return EPOCH + self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@contextlib.contextmanager
+def _fake_clock(now: float = 1000.0):
+    real = scheduler.time
+    scheduler.time = clock = _Clock(now)
+    try:
+        yield clock
+    finally:
+        scheduler.time = real
+
+
+def _dispatch(sched: FeedScheduler) -> float:
+    """Pop the next due feed, as run() does, and return its due time."""
+    due, _, _ = heapq.heappop(sched._queue)
+    return due
+
+
+def _complete(sched: FeedScheduler, name: str, clock: _Clock, error: Exception | None = None) -> None:
+    future = Future()
+    result = None if error else {"iocs": 5, "inserted": 2}
+    future.set_result((clock.time(), 1.5, result, error))
+    sched._finish(name, future)
+
+
+def test_due_times_are_anchored_and_do_not_drift():
+    with _fake_clock() as clock:
+        sched = FeedScheduler([{"name": "a", "interval": 100}], lambda feed: {}, default_interval=3600)
+        assert _dispatch(sched) == 1000
+
+        # A 30 second fetch does not push the next tick back by 30 seconds.
+        clock.now = 1030
+        _complete(sched, "a", clock)
+        assert _dispatch(sched) == 1100
+        clock.now = 1145
+        _complete(sched, "a", clock)
+        assert _dispatch(sched) == 1200
+
+        # A run that overshoots a whole interval is rescheduled from now, not in the past.
+        clock.now = 1450
+        _complete(sched, "a", clock)
+        assert _dispatch(sched) == 1450
+
+
+def test_failures_back_off_exponentially_up_to_the_cap():
+    with _fake_clock() as clock:
+        sched = FeedScheduler(
+            [{"name": "a", "interval": 100}], lambda feed: {}, default_interval=3600, max_backoff=5 * RETRY_BASE
+        )
+        _dispatch(sched)
+        delays = []
+        for _ in range(5):
+            _complete(sched, "a", clock, error=RuntimeError("boom"))
+            due = _dispatch(sched)
+            delays.append(due - clock.now)
+            clock.now = due
+        assert delays == [RETRY_BASE, 2 * RETRY_BASE, 4 * RETRY_BASE, 5 * RETRY_BASE, 5 * RETRY_BASE]
+        state = sched.status()["feeds"]["a"]
+        assert state["consecutive_failures"] == 5
+        assert (state["last_status"], state["last_error"]) == ("error", "boom")
+
+        # One success clears the failure count and returns to the normal cadence.
+        _complete(sched, "a", clock)
+        assert _dispatch(sched) == clock.now + 100
+        state = sched.status()["feeds"]["a"]
+        assert (state["consecutive_failures"], state["last_status"], state["last_error"]) == (0, "ok", None)
+        _complete(sched, "a", clock, error=RuntimeError("again"))
+        assert _dispatch(sched) == clock.now + RETRY_BASE
+
+
+def test_run_writes_status_and_stops_after_iterations():
+    calls = []
+
+    def run_feed(feed: dict) -> dict:
+        calls.append(feed["name"])
+        if feed["name"] == "bad":
+            raise ValueError("feed down")
+        return {"iocs": 7, "inserted": 3}
+
+    feeds = [{"name": "good", "interval": 60}, {"name": "bad"}]
+    with tempfile.TemporaryDirectory() as root:
+        status_path = os.path.join(root, "state", "schedule_status.json")
+        assert load_status(status_path) == {"updated_at": None, "feeds": {}}
+        FeedScheduler(feeds, run_feed, default_interval=600, iterations=1, status_path=status_path).run()
+        status = load_status(status_path)
+
+    assert sorted(calls) == ["bad", "good"]
+    good, bad = status["feeds"]["good"], status["feeds"]["bad"]
+    assert (good["interval"], good["runs"], good["last_status"]) == (60, 1, "ok")
+    assert (good["last_iocs"], good["last_inserted"], good["next_run"]) == (7, 3, None)
+    assert (bad["interval"], bad["last_status"], bad["last_error"]) == (600, "error", "feed down")
+    assert bad["consecutive_failures"] == 1 and not bad["running"]
+    assert status["updated_at"].endswith("Z")
+
+
+def test_on_idle_runs_once_per_pass():
+    idle = []
+    feeds = [{"name": name, "interval": 60} for name in ("a", "b", "c")]
+    sched = FeedScheduler(
+        feeds, lambda feed: {}, default_interval=60, iterations=1, on_idle=lambda: idle.append(sched.status())
+    )
+    sched.run()
+    # All three are due at once and run together, so the hook fires once, after the last.
+    assert len(idle) == 1
+    assert all(state["runs"] == 1 and not state["running"] for state in idle[0]["feeds"].values())
+
+
+def test_failing_idle_hook_does_not_stop_the_scheduler():
+    def on_idle() -> None:
+        raise OSError("disk full")
+
+    feeds = [{"name": "a"}, {"name": "b"}]
+    sched = FeedScheduler(feeds, lambda feed: {}, default_interval=60, iterations=1, on_idle=on_idle)
+    sched.run()
+    assert [state["runs"] for state in sched.status()["feeds"].values()] == [1, 1]
+
+
+def test_api_schedule_reads_custom_status_file():
+    with tempfile.TemporaryDirectory() as root:
+        status_path = os.path.join(root, "elsewhere", "status.json")
+        FeedScheduler([{"name": "a"}], lambda feed: {}, default_interval=60, iterations=1, status_path=status_path).run()
+        os.environ["AGGREGATOR_SCHEDULE_STATUS"] = status_path
+        try:
+            client = create_app(os.path.join(root, "iocs.db")).test_client()
+        finally:
+            del os.environ["AGGREGATOR_SCHEDULE_STATUS"]
+        assert client.get("/api/schedule").get_json()["data"]["feeds"]["a"]["runs"] == 1
+        # Without the override the app reads next to the database, where nothing was written.
+        client = create_app(os.path.join(root, "iocs.db")).test_client()
+        assert client.get("/api/schedule").get_json()["data"]["feeds"] == {}
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All scheduler tests passed!")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Test the memory-mapped lookup snapshot."""
+
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.app import create_app
+from aggregator.bench import serve_directory
+from aggregator.cli import build_parser
+from aggregator.normalizer import normalize_items
+from aggregator.snapshot import Snapshot, SnapshotReader, write_snapshot
+from aggregator.store import upsert_iocs
+
+VALUES = [
+    "10.0.0.0/8",
+    "10.1.0.0/16",
+    "10.1.2.0/24",
+    "10.1.2.3",
+    "10.200.0.0/16",
+    "2001:db8::/32",
+    "2001:db8:1::/48",
+    "evil.com",
+    "http://bad.org/x",
+]
+
+
+def _build(root: str) -> str:
+    db_path = os.path.join(root, "iocs.db")
+    upsert_iocs(db_path, normalize_items(VALUES, source="a", default_severity="high"))
+    upsert_iocs(db_path, normalize_items(["evil.com"], source="b", default_severity="low"))
+    path = os.path.join(root, "iocs.snapshot")
+    info = write_snapshot(db_path, path)
+    assert info["values"] == len(VALUES)
+    assert (info["ipv4_ranges"], info["ipv6_ranges"]) == (4, 2)
+    return path
+
+
+def _matches(snapshot: Snapshot, value: str) -> list[tuple[str, str]]:
+    return [(record["match"], record["value"]) for record in snapshot.lookup(value)]
+
+
+def test_exact_and_nested_cidr_lookup():
+    with tempfile.TemporaryDirectory() as root:
+        snapshot = Snapshot(_build(root))
+        assert _matches(snapshot, "10.1.2.3") == [
+            ("exact", "10.1.2.3"),
+            ("cidr", "10.1.2.0/24"),
+            ("cidr", "10.1.0.0/16"),
+            ("cidr", "10.0.0.0/8"),
+        ]
+        assert _matches(snapshot, "10.1.9.9") == [("cidr", "10.1.0.0/16"), ("cidr", "10.0.0.0/8")]
+        assert _matches(snapshot, "10.200.1.1") == [("cidr", "10.200.0.0/16"), ("cidr", "10.0.0.0/8")]
+        assert _matches(snapshot, "::ffff:10.1.2.3")[0] == ("exact", "10.1.2.3")
+        assert _matches(snapshot, "2001:DB8:1::5") == [("cidr", "2001:db8:1::/48"), ("cidr", "2001:db8::/32")]
+        assert _matches(snapshot, "11.0.0.1") == []
+        assert _matches(snapshot, "10.1.0.0/16") == [("exact", "10.1.0.0/16")]
+
+
+def test_canonicalized_values_and_sources():
+    with tempfile.TemporaryDirectory() as root:
+        snapshot = Snapshot(_build(root))
+        records = snapshot.lookup("EVIL.com.")
+        assert [record["value"] for record in records] == ["evil.com"]
+        assert [source["source"] for source in records[0]["sources"]] == ["a", "b"]
+        assert _matches(snapshot, "HTTP://bad.org:80/x") == [("exact", "http://bad.org/x")]
+        assert _matches(snapshot, "good.com") == []
+
+
+def test_reader_picks_up_replaced_snapshot():
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "iocs.snapshot")
+        reader = SnapshotReader(path)
+        assert reader.get() is None
+        _build(root)
+        first = reader.get()
+        assert reader.get() is first
+        upsert_iocs(os.path.join(root, "iocs.db"), normalize_items(["1.2.3.4"], source="c", default_severity=None))
+        write_snapshot(os.path.join(root, "iocs.db"), path)
+        assert reader.get() is not first
+        assert _matches(reader.get(), "1.2.3.4") == [("exact", "1.2.3.4")]
+        assert _matches(first, "1.2.3.4") == []
+
+
+
+def test_fetch_writes_the_snapshot_the_app_reads():
+    with tempfile.TemporaryDirectory() as root:
+        with open(os.path.join(root, "feed.txt"), "w", encoding="utf-8") as handle:
+            handle.write("evil.com\n10.0.0.0/8\n")
+        server, base_url = serve_directory(root)
+        try:
+            feeds_path = os.path.join(root, "feeds.json")
+            with open(feeds_path, "w", encoding="utf-8") as handle:
+                json.dump([{"name": "a", "url": f"{base_url}/feed.txt", "format": "txt"}], handle)
+            db_path = os.path.join(root, "data", "iocs.db")
+            os.makedirs(os.path.dirname(db_path))
+            argv = ["fetch", "--feeds", feeds_path, "--db", db_path, "--log", os.path.join(root, "ingest.log")]
+            args = build_parser().parse_args(argv)
+            assert args.func(args) == 0
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        client = create_app(db_path).test_client()
+        response = client.get("/api/lookup?value=10.1.2.3")
+        assert response.status_code == 200
+        assert [match["value"] for match in response.get_json()["data"]["matches"]] == ["10.0.0.0/8"]
+
+        args = build_parser().parse_args(argv + ["--no-snapshot"])
+        assert args.no_snapshot and args.snapshot == ""
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All snapshot tests passed!")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Guard CLI startup: subcommands run from cron must not import the web stack."""
+
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+RUN_CLI = os.path.join(ROOT, "run_cli.py")
+
+IMPORT_LINE = re.compile(r"import time:\s+\d+ \|\s+(\d+) \| (\s*)(\S+)")
+WEB_STACK = {"flask", "werkzeug", "jinja2"}
+HTTP_STACK = {"requests", "urllib3"}
+# Everything `search` may load from the package; the archive, scanner, profiler,
+# scheduler, snapshot and daemon are imported by the commands that use them.
+SEARCH_MODULES = {
+    "aggregator",
+    "aggregator.cli",
+    "aggregator.defaults",
+    "aggregator.metrics",
+    "aggregator.normalizer",
+    "aggregator.parsers",
+    "aggregator.store",
+    "aggregator.utils",
+}
+
+# Milliseconds of imports from aggregator onward, best of RUNS. Well above what a
+# lazy CLI needs, well below what importing Flask costs.
+SEARCH_BUDGET_MS = 75
+FETCH_BUDGET_MS = 400
+RUNS = 3
+
+
+def _import_profile(args: list[str], cwd: str) -> tuple[float, set[str]]:
+    """Run the CLI under ``-X importtime``; return (aggregator import ms, imported modules)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", RUN_CLI, *args],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    total_us = 0
+    started = False
+    modules = set()
+    for line in proc.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = match.groups()
+        modules.add(module)
+        # Skip interpreter startup (encodings, site) and time only what the CLI pulls in.
+        started = started or module.startswith("aggregator")
+        if started and not indent:
+            total_us += int(cumulative)
+    return total_us / 1000, modules
+
+
+def _best_of(args: list[str], cwd: str) -> tuple[float, set[str], set[str]]:
+    """Best import time over RUNS, with every module and top-level package any run loaded."""
+    profiles = [_import_profile(args, cwd) for _ in range(RUNS)]
+    modules = set().union(*(loaded for _, loaded in profiles))
+    return min(ms for ms, _ in profiles), modules, {module.split(".")[0] for module in modules}
+
+
+def test_search_startup_skips_web_and_http_stack():
+    with tempfile.TemporaryDirectory() as root:
+        millis, modules, packages = _best_of(["search", "--db", "iocs.db", "--query", "x"], root)
+        assert {module for module in modules if module.startswith("aggregator")} == SEARCH_MODULES
+        assert "concurrent.futures" not in modules
+        assert not packages & (WEB_STACK | HTTP_STACK), sorted(packages & (WEB_STACK | HTTP_STACK))
+        assert millis < SEARCH_BUDGET_MS, f"search imports took {millis:.1f} ms"
+
+
+def test_fetch_startup_skips_web_stack():
+    with tempfile.TemporaryDirectory() as root:
+        # Nothing listens on the discard port, so the fetch fails fast after the imports.
+        with open(os.path.join(root, "feeds.json"), "w", encoding="utf-8") as handle:
+            json.dump([{"name": "down", "url": "http://127.0.0.1:9/feed.txt", "format": "txt"}], handle)
+        args = ["fetch", "--feeds", "feeds.json", "--db", "iocs.db", "--retries", "0", "--log", "logs/ingest.log"]
+        millis, _, packages = _best_of(args, root)
+        assert "requests" in packages
+        assert not packages & WEB_STACK, sorted(packages & WEB_STACK)
+        assert millis < FETCH_BUDGET_MS, f"fetch imports took {millis:.1f} ms"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All startup tests passed!")
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Test the SQLite store: per-IOC summaries, score ordering and pagination."""
+
+import contextlib
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+
+from aggregator.normalizer import normalize_items
+from aggregator import store
+from aggregator.store import (
+    count_iocs,
+    create_sharded_store,
+    get_filter_values,
+    get_stats,
+    init_db,
+    iter_ioc_values,
+    search_iocs,
+    shard_paths,
+    suggest_iocs,
+    upsert_iocs,
+)
+
+# Every layout test runs against a single file and both sharded partitions.
+LAYOUTS = ("single", "hash", "type")
+
+
+@contextlib.contextmanager
+def _store(layout: str):
+    with tempfile.TemporaryDirectory() as root:
+        if layout == "single":
+            yield os.path.join(root, "iocs.db")
+        else:
+            path = os.path.join(root, "shards")
+            create_sharded_store(path, shards=3, partition=layout)
+            yield path
+
+
+def _ingest(db_path: str, values: list[str], source: str, severity: str, now: str) -> int:
+    return upsert_iocs(db_path, normalize_items(values, source=source, default_severity=severity, now=now))
+
+
+def _summary(db_path: str, value: str) -> tuple:
+    for path in shard_paths(db_path):
+        with sqlite3.connect(path) as conn:
+            row = conn.execute(
+                "SELECT source_count, max_severity, first_seen, last_seen, score FROM iocs WHERE value = ?", (value,)
+            ).fetchone()
+        if row:
+            return row
+    return None
+
+
+def _seed(db_path: str) -> None:
+    _ingest(db_path, ["1.2.3.4", "evil.com", "5.6.7.8"], "a", "low", "2024-01-01T00:00:00Z")
+    _ingest(db_path, ["1.2.3.4", "evil.com"], "b", "high", "2024-01-02T00:00:00Z")
+    _ingest(db_path, ["1.2.3.4"], "c", "medium", "2024-01-03T00:00:00Z")
+
+
+def test_summaries_update_incrementally():
+    for layout in LAYOUTS:
+        with _store(layout) as db_path:
+            _seed(db_path)
+            assert _summary(db_path, "1.2.3.4") == (3, "high", "2024-01-01T00:00:00Z", "2024-01-03T00:00:00Z", 9)
+            assert _summary(db_path, "evil.com") == (2, "high", "2024-01-01T00:00:00Z", "2024-01-02T00:00:00Z", 6)
+            assert _summary(db_path, "5.6.7.8") == (1, "low", "2024-01-01T00:00:00Z", "2024-01-01T00:00:00Z", 1)
+
+            # A source seen again only moves last_seen.
+            assert _ingest(db_path, ["5.6.7.8"], "a", "critical", "2024-02-01T00:00:00Z") == 0
+            assert _summary(db_path, "5.6.7.8") == (1, "low", "2024-01-01T00:00:00Z", "2024-02-01T00:00:00Z", 1)
+
+
+def test_old_databases_are_migrated_and_backfilled():
+    with tempfile.TemporaryDirectory() as root:
+        db_path = os.path.join(root, "iocs.db")
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(
+                "CREATE TABLE iocs (id INTEGER PRIMARY KEY AUTOINCREMENT, type TEXT NOT NULL, "
+                "value TEXT NOT NULL, created_at TEXT NOT NULL, UNIQUE(type, value))"
+            )
+            conn.execute(
+                "CREATE TABLE ioc_sources (id INTEGER PRIMARY KEY AUTOINCREMENT, ioc_id INTEGER NOT NULL, "
+                "source TEXT NOT NULL, severity TEXT NOT NULL, date_added TEXT NOT NULL, UNIQUE(ioc_id, source))"
+            )
+            conn.execute("INSERT INTO iocs (type, value, created_at) VALUES ('ip', '1.2.3.4', 'x')")
+            conn.executemany(
+                "INSERT INTO ioc_sources (ioc_id, source, severity, date_added) VALUES (1, ?, ?, ?)",
+                [("a", "medium", "2024-01-02"), ("b", "critical", "2024-01-01")],
+            )
+        init_db(db_path)
+        assert _summary(db_path, "1.2.3.4") == (2, "critical", "2024-01-01", "2024-01-02", 8)
+        assert [row["value"] for row in suggest_iocs(db_path, "1.2")] == ["1.2.3.4"]
+
+
+def test_score_sort_min_sources_and_sql_paging():
+    for layout in LAYOUTS:
+        with _store(layout) as db_path:
+            _seed(db_path)
+            rows = search_iocs(db_path, sort="score")
+            assert [row["value"] for row in rows] == ["1.2.3.4"] * 3 + ["evil.com"] * 2 + ["5.6.7.8"]
+            assert [row["value"] for row in search_iocs(db_path, sort="score", limit=2, offset=2)] == [
+                "1.2.3.4",
+                "evil.com",
+            ]
+            assert {row["value"] for row in search_iocs(db_path, ioc_type="IP", sort="score", min_sources=2)} == {
+                "1.2.3.4"
+            }
+            assert count_iocs(db_path, min_sources=2) == 5
+            assert count_iocs(db_path, ioc_type="ip") == 4
+            assert count_iocs(db_path, query="evil") == 2
+            rejected = False
+            try:
+                search_iocs(db_path, sort="nope")
+            except ValueError:
+                rejected = True
+            assert rejected, "unknown sort was accepted"
+
+
+def test_explicit_type_matches_case_insensitively():
+    items = [{"value": "9.9.9.9", "type": "IP"}, {"value": "bad.example", "type": "Domain"}]
+    for layout in LAYOUTS:
+        with _store(layout) as db_path:
+            _seed(db_path)
+            upsert_iocs(db_path, normalize_items(items, source="d", default_severity="low"))
+            assert count_iocs(db_path, ioc_type="ip") == 5
+            assert count_iocs(db_path, ioc_type="IP", query="9.9.9.9") == 1
+            assert [row["value"] for row in search_iocs(db_path, ioc_type="domain", source="d")] == ["bad.example"]
+            assert [row["value"] for row in suggest_iocs(db_path, "9.9", ioc_type="ip")] == ["9.9.9.9"]
+
+
+def test_suggest_prefixes_rank_by_score():
+    for layout in LAYOUTS:
+        with _store(layout) as db_path:
+            _seed(db_path)
+            _ingest(
+                db_path,
+                ["login.evil.com", "https://cdn.evil.com/a", "evil.community.org"],
+                "a",
+                "low",
+                "2024-01-04T00:00:00Z",
+            )
+            assert [row["value"] for row in suggest_iocs(db_path, "EVIL")] == [
+                "evil.com",
+                "login.evil.com",
+                "evil.community.org",
+                "https://cdn.evil.com/a",
+            ]
+            assert [row["value"] for row in suggest_iocs(db_path, "evil.com", limit=2)] == [
+                "evil.com",
+                "login.evil.com",
+            ]
+            assert [row["value"] for row in suggest_iocs(db_path, "cdn.", ioc_type="url")] == [
+                "https://cdn.evil.com/a"
+            ]
+            assert [row["value"] for row in suggest_iocs(db_path, "1.2.")] == ["1.2.3.4"]
+            assert suggest_iocs(db_path, "1.2.")[0]["score"] == 9
+            assert suggest_iocs(db_path, "org") == []
+            assert suggest_iocs(db_path, "  ") == []
+
+
+def _ingest_spread(db_path: str) -> None:
+    for day in range(1, 29):
+        values = [f"10.0.{day}.{i}" for i in range(1, 4)] + [f"host{day}.example.com", f"http://x{day}.net/p"]
+        _ingest(db_path, values, f"feed{day % 3}", ("low", "high")[day % 2], f"2024-02-{day:02d}T00:00:00Z")
+
+
+def test_sharded_stores_match_single_file_pages():
+    cases = (({}, "date"), ({"ioc_type": "ip"}, "date"), ({"query": "example"}, "date"), ({}, "score"))
+    with _store("single") as single:
+        _ingest_spread(single)
+        expected_stats = get_stats(single)
+        expected_filters = get_filter_values(single)
+        for layout in ("hash", "type"):
+            with _store(layout) as sharded:
+                _ingest_spread(sharded)
+                assert get_stats(sharded) == expected_stats
+                assert get_filter_values(sharded) == expected_filters
+                assert sorted(iter_ioc_values(sharded)) == sorted(iter_ioc_values(single))
+                for filters, sort in cases:
+                    total = count_iocs(sharded, **filters)
+                    assert total == count_iocs(single, **filters)
+                    # Rows tied on the sort key may come in any order, so compare the keys page
+                    # by page and the rows over all pages.
+                    key = "score" if sort == "score" else "date_added"
+                    pages = [
+                        search_iocs(sharded, sort=sort, limit=25, offset=offset, **filters)
+                        for offset in range(0, total, 25)
+                    ]
+                    expected = search_iocs(single, sort=sort, **filters)
+                    assert [row[key] for page in pages for row in page] == [row[key] for row in expected]
+                    assert sorted(map(repr, sum(pages, []))) == sorted(map(repr, expected))
+                    assert search_iocs(sharded, sort=sort, limit=25, offset=total, **filters) == []
+
+
+def test_sharded_fan_out_through_process_pool():
+    workers = store.SHARD_WORKERS
+    store.SHARD_WORKERS = 2
+    try:
+        with _store("hash") as db_path:
+            _ingest_spread(db_path)
+            assert count_iocs(db_path) == 28 * 5
+            assert [row["date_added"][:10] for row in search_iocs(db_path, limit=2)] == ["2024-02-28"] * 2
+            assert get_stats(db_path)["total_sources"] == 3
+    finally:
+        store.SHARD_WORKERS = workers
+        store._shutdown_shard_executor()
+
+
+def test_shard_pool_is_created_once_across_threads():
+    workers = store.SHARD_WORKERS
+    store.SHARD_WORKERS = 2
+    try:
+        with _store("hash") as db_path:
+            _ingest_spread(db_path)
+            barrier = threading.Barrier(4)
+            counts, executors = [], []
+
+            def search() -> None:
+                barrier.wait()
+                counts.append(count_iocs(db_path))
+                executors.append(store._shard_executor)
+
+            threads = [threading.Thread(target=search) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert counts == [28 * 5] * 4
+            assert len({id(executor) for executor in executors}) == 1
+            assert executors[0]._mp_context.get_start_method() == "spawn"
+    finally:
+        store.SHARD_WORKERS = workers
+        store._shutdown_shard_executor()
+    assert store._shard_executor is None
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✓ {name}")
+    print("\n✅ All store tests passed!")